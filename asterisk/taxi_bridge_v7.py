@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Taxi AI Asterisk Bridge v7.7 - OPUS SUPPORT
+Taxi AI Asterisk Bridge v7.7.1 - OPUS SUPPORT
 
 Architecture:
   Asterisk AudioSocket <-> Bridge <-> Edge Function (taxi-realtime-paired)
@@ -11,12 +11,19 @@ Key Features:
   - Context-pairing architecture with eager init (phone sent later via update_phone)
   - Dynamic format detection with smart locking (ulaw/slin/slin16/opus)
   - High-quality DSP pipeline: Volume Boost -> AGC -> Pre-emphasis
-  - resample_poly for all audio paths (preserves consonant transients)
+  - Polyphase resampling via upfirdn with cached FIR plans; outbound AI audio
+    keeps filter history across chunks (no transients at chunk boundaries)
   - Session handoff support for 90s edge function limits
   - Bounded queues to prevent OOM under network stalls
   - Comprehensive diagnostics with WS/Asterisk heartbeat tracking
 
 Changelog:
+  v7.7.1: Low-latency DSP/transport pass: upfirdn resampling with cached
+        plans, numba-fused inbound DSP (optional), outbound resample/encode
+        on a DSP worker thread, Opus batch encode carrying sub-frame remainders,
+        binary-only AI audio, orjson/pybase64/uvloop when installed, per-tick
+        playback pacing with flow_pause/flow_resume backpressure, heartbeat
+        watchdog for Asterisk reads
   v7.7: Added Opus codec support via opuslib for WhatsApp native 48kHz audio
   v7.6: Refactored DSP into AudioProcessor class, improved format detection,
         added session handoff, enhanced diagnostics, cleaner architecture
@@ -27,18 +34,24 @@ Changelog:
 
 import asyncio
 import base64
+import ctypes
 import json
 import logging
 import os
+import random
+import socket
 import struct
 import time
+import warnings
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from functools import lru_cache
 from math import gcd
-from typing import Deque, Optional, Tuple
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
 
 import numpy as np
-from scipy.signal import resample_poly
+from scipy.signal import firwin, upfirdn
 import websockets
 from websockets.exceptions import ConnectionClosed, WebSocketException
 
@@ -55,6 +68,49 @@ except ImportError:
     OpusDecoder = None
     OPUS_APPLICATION_VOIP = 2048
 
+# Numba JIT support (optional - falls back to NumPy kernels if not available)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    njit = None
+
+# orjson for WebSocket control messages (optional - falls back to stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# pybase64 for AI audio payloads (optional - falls back to stdlib base64)
+try:
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    PYBASE64_AVAILABLE = False
+    pybase64 = None
+
+# audioop for µ-law decode (optional - stdlib until 3.13, then the audioop-lts
+# package; falls back to the NumPy lookup table)
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+    AUDIOOP_AVAILABLE = True
+except ImportError:
+    AUDIOOP_AVAILABLE = False
+    audioop = None
+
+# uvloop event loop (optional - falls back to the default asyncio loop)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+    uvloop = None
+
 
 # =============================================================================
 # CONFIGURATION
@@ -107,7 +163,12 @@ RATE_OPUS = 48000     # Opus native (WhatsApp)
 OPUS_FRAME_MS = 20            # 20ms frames (standard)
 OPUS_BITRATE = 32000          # 32kbps VBR (good quality, low bandwidth)
 OPUS_COMPLEXITY = 5           # 0-10, higher = better quality but more CPU
+OPUS_MAX_PACKET_BYTES = 4000  # libopus' recommended encode output capacity
 OPUS_APPLICATION = "voip"     # Optimized for speech
+# PCM rate on our side of libopus. The bitstream is rate-independent, so
+# running the codec at the AI rate lets libopus convert internally and
+# spares a Python-side polyphase resample on every encode and decode.
+OPUS_PCM_RATE = RATE_AI
 
 # Format Detection
 LOCK_FORMAT_ULAW = _env_bool("LOCK_FORMAT_ULAW", False)   # Force 8kHz ulaw
@@ -117,6 +178,11 @@ LOCK_FORMAT_SLIN16 = _env_bool("LOCK_FORMAT_SLIN16", True)  # Force 16kHz slin16
 PREFER_OPUS = _env_bool("PREFER_OPUS", OPUS_AVAILABLE) and not LOCK_FORMAT_SLIN16
 PREFER_SLIN16 = True  # Prefer wideband when available
 FORMAT_LOCK_DURATION_S = 0.75  # Debounce format switching
+# 20ms AudioSocket PCM frame sizes (µ-law 8k, slin 8k, slin16); never Opus
+PCM_FRAME_SIZES = frozenset((160, 320, 640))
+# Opus at 32kbps is far below PCM size: anything under a quarter of a 20ms
+# 48kHz mono PCM frame (1920 bytes) is taken as Opus
+OPUS_MAX_DETECT_BYTES = int(RATE_OPUS * 0.02 * 2) // 4
 
 # DSP Pipeline Configuration
 ENABLE_VOLUME_BOOST = True
@@ -127,20 +193,31 @@ AGC_MAX_GAIN = 15.0            # Maximum gain multiplier
 AGC_MIN_GAIN = 1.0             # Never reduce volume
 AGC_SMOOTHING = 0.15           # Gain adaptation speed
 AGC_FLOOR_RMS = 10             # Below this, don't apply AGC
+AGC_ENERGY_DECAY = 0.5         # EWMA weight of past frames in the AGC energy estimate
+SILENCE_PEAK_THRESHOLD = 4     # Peak below this = digital silence, skip DSP entirely
 PRE_EMPHASIS_COEFF = _env_float("PRE_EMPHASIS_COEFF", 0.95)
 
 # Connection Settings
 MAX_RECONNECT_ATTEMPTS = 5
 RECONNECT_BASE_DELAY_S = 1.0
+RECONNECT_MAX_DELAY_S = 8.0  # Backoff cap (before ±50% jitter)
 HEARTBEAT_INTERVAL_S = 15.0
 WS_PING_INTERVAL = 20
 WS_PING_TIMEOUT = 20
 WS_APP_PING_INTERVAL_S = 25.0  # Application-level ping to prevent Supabase idle timeout
 ASTERISK_READ_TIMEOUT_S = 30.0
+ASTERISK_WRITE_BATCH = 4  # Max overdue PCM frames coalesced into one write
+WS_SEND_BATCH_FRAMES = 2  # Inbound frames per WS message (adds one frame of latency)
+SOCKET_SNDBUF_BYTES = 1 << 18  # Kernel send buffer for the WS socket (absorbs hiccups)
+ASTERISK_SNDBUF_BYTES = 8192   # Asterisk socket: ~0.25s of slin16 queued at most, not seconds
+WS_WRITE_LIMIT = 1 << 18  # WS transport high-water mark before send() waits to drain
 
 # Queue Bounds (memory safety)
 AUDIO_QUEUE_MAXLEN = 200
 PENDING_BUFFER_MAXLEN = 100
+PENDING_FLUSH_GROUP = 16  # Parked chunks joined into one WS message on reconnect
+PLAYBACK_HIGH_WATERMARK_S = 8.0  # Queued playback above this → send flow_pause to edge
+PLAYBACK_LOW_WATERMARK_S = 3.0   # Drained back below this → send flow_resume
 
 # AudioSocket Message Types
 MSG_HANGUP = 0x00
@@ -151,6 +228,10 @@ MSG_AUDIO = 0x10
 ULAW_BIAS = 0x84
 ULAW_CLIP = 32635
 
+# Silence fill bytes (µ-law 0xFF and PCM 0x00 both decode to zero)
+ULAW_SILENCE_BYTE = b"\xff"
+PCM_SILENCE_BYTE = b"\x00"
+
 
 # =============================================================================
 # LOGGING
@@ -164,6 +245,242 @@ logging.basicConfig(
 logger = logging.getLogger("TaxiBridge")
 
 
+# =============================================================================
+# µ-LAW TABLES
+# =============================================================================
+
+def _build_ulaw_decode_lut() -> np.ndarray:
+    """Decode all 256 µ-law codes to int16 PCM (G.711)."""
+    ulaw = ~np.arange(256, dtype=np.uint8)
+    sign = ulaw & 0x80
+    exponent = (ulaw >> 4) & 0x07
+    mantissa = ulaw & 0x0F
+    
+    sample = (mantissa.astype(np.int32) << 3) + ULAW_BIAS
+    sample <<= exponent
+    sample -= ULAW_BIAS
+    return np.where(sign, -sample, sample).astype(np.int16)
+
+
+def _build_ulaw_encode_lut() -> np.ndarray:
+    """Encode every int16 value to µ-law, indexed by the sample's uint16 bit pattern."""
+    pcm = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32)
+    sign = np.where(pcm < 0, 0x80, 0)
+    pcm = np.clip(np.abs(pcm), 0, ULAW_CLIP) + ULAW_BIAS
+    
+    # Exponent = position of the top set bit, read off frexp (pcm = m * 2**e,
+    # 0.5 <= m < 1, so floor(log2(pcm)) = e - 1) with no transcendental call
+    exponent = np.clip(np.frexp(pcm)[1] - 8, 0, 7)
+    mantissa = (pcm >> (exponent + 3)) & 0x0F
+    ulaw = (~(sign | (exponent << 4) | mantissa)) & 0xFF
+    return ulaw.astype(np.uint8)
+
+
+# µ-law has only 256 codes and int16 only 65536 values, so both directions
+# are a single gather (no per-sample math, sign handling or clipping)
+_ULAW_DECODE_LUT = _build_ulaw_decode_lut()
+_ULAW_ENCODE_LUT = _build_ulaw_encode_lut()  # 64 KiB
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+# AudioSocket frame header: 1-byte type + big-endian u16 payload length
+_AUDIOSOCKET_HEADER = struct.Struct(">BH")
+
+
+@lru_cache(maxsize=32)
+def _up_down(from_rate: int, to_rate: int) -> Tuple[int, int]:
+    """Reduced (up, down) resampling factors; rates are fixed per session."""
+    g = gcd(from_rate, to_rate)
+    return to_rate // g, from_rate // g
+
+
+# Factors for every pair of rates the bridge uses, so the per-frame path is a
+# single dict subscript; anything else falls back to _up_down()
+_RATE_PAIRS: Dict[Tuple[int, int], Tuple[int, int]] = {
+    (a, b): _up_down(a, b)
+    for a in (RATE_ULAW, RATE_SLIN16, RATE_AI, RATE_OPUS)
+    for b in (RATE_ULAW, RATE_SLIN16, RATE_AI, RATE_OPUS)
+    if a != b
+}
+
+
+@lru_cache(maxsize=32)
+def _fir_taps(up: int, down: int) -> np.ndarray:
+    """Anti-aliasing FIR for polyphase resampling, designed once per (up, down).
+    
+    Same filter scipy's resample_poly designs on every call (Kaiser β=5,
+    half-length 10 × max(up, down)).
+    """
+    max_rate = max(up, down)
+    taps = firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=("kaiser", 5.0))
+    taps = taps.astype(np.float32)
+    taps.setflags(write=False)
+    return taps
+
+
+@lru_cache(maxsize=64)
+def _polyphase_plan(up: int, down: int, n_in: int) -> Tuple[np.ndarray, int, int]:
+    """Filter and output slice for resampling n_in samples by up/down.
+    
+    Reproduces resample_poly's set-up (gain × up, zero padding that centres
+    the output, trim bounds) once per frame length instead of per call.
+    """
+    taps = _fir_taps(up, down)
+    half_len = (taps.size - 1) // 2
+    n_out = -(-n_in * up // down)
+    n_pre_pad = down - half_len % down
+    n_pre_remove = (half_len + n_pre_pad) // down
+    # Post-pad until upfirdn yields enough samples past the trimmed start
+    n_post_pad = 0
+    while (((n_in - 1) * up + taps.size + n_pre_pad + n_post_pad) - 1) // down + 1 \
+            < n_out + n_pre_remove:
+        n_post_pad += 1
+    h = np.concatenate((np.zeros(n_pre_pad, dtype=np.float32), taps * np.float32(up),
+                        np.zeros(n_post_pad, dtype=np.float32)))
+    h.setflags(write=False)
+    return h, n_pre_remove, n_pre_remove + n_out
+
+
+def _resample_f32(samples: np.ndarray, up: int, down: int) -> np.ndarray:
+    """Polyphase-resample float32 samples (resample_poly without its set-up)."""
+    h, start, stop = _polyphase_plan(up, down, samples.size)
+    return upfirdn(h, samples, up, down)[start:stop]
+
+
+def _to_int16(samples: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Saturate a float buffer to int16 (may clip `samples` in place).
+    
+    Writes into `out` (same size, int16) when given instead of allocating.
+    """
+    if out is None:
+        out = np.empty(samples.size, dtype=np.int16)
+    if NUMBA_AVAILABLE:
+        _saturate_kernel(samples, out)  # clip + cast in one pass
+        return out
+    np.clip(samples, -32768, 32767, out=samples)
+    np.copyto(out, samples, casting="unsafe")
+    return out
+
+
+def _grown(buf: np.ndarray, n: int) -> np.ndarray:
+    """Return `buf` if it holds at least n items, else a larger replacement.
+    
+    Scratch buffers live on their owner and each is only touched from one
+    thread (inbound ones from the event loop, outbound ones from the DSP
+    worker); callers slice [:n] and copy out with tobytes().
+    """
+    if buf.size >= n:
+        return buf
+    return np.empty(max(n, 2 * buf.size), dtype=buf.dtype)
+
+
+if NUMBA_AVAILABLE:
+    # No cache=True: the service runs with a read-only filesystem
+    # (ProtectSystem=strict), so there is nowhere to write it.
+    @njit(nogil=True, fastmath=True)
+    def _inbound_kernel(pcm, gain, coeff, out):
+        """Fused gain + pre-emphasis + saturating cast; returns the input energy.
+        
+        y[i] = gain * (x[i] - coeff * x[i-1]) reads x[i-1] from the input
+        rather than carrying the previous output, so the loop vectorizes.
+        """
+        energy = 0.0
+        prev = 0.0
+        for i in range(pcm.size):
+            x = float(pcm[i])
+            energy += x * x
+            y = gain * (x - coeff * prev)
+            prev = x
+            if y > 32767.0:
+                y = 32767.0
+            elif y < -32768.0:
+                y = -32768.0
+            out[i] = np.int16(y)
+        return energy
+    
+    @njit(nogil=True, fastmath=True)
+    def _saturate_kernel(samples, out):
+        """Clip float samples to the int16 range and truncate, in one pass."""
+        for i in range(samples.size):
+            v = samples[i]
+            if v > 32767.0:
+                v = 32767.0
+            elif v < -32768.0:
+                v = -32768.0
+            out[i] = np.int16(v)
+    
+    @njit(nogil=True)
+    def _ulaw_gather_kernel(codes, lut, out):
+        """µ-law encode from a uint16 view of int16 samples (out[i] = lut[codes[i]])."""
+        for i in range(codes.size):
+            out[i] = lut[codes[i]]
+    
+    @njit(nogil=True, fastmath=True)
+    def _ulaw_encode_kernel(samples, lut, out):
+        """Saturate float samples to int16 and µ-law encode them, in one pass."""
+        for i in range(samples.size):
+            v = samples[i]
+            if v > 32767.0:
+                v = 32767.0
+            elif v < -32768.0:
+                v = -32768.0
+            out[i] = lut[np.uint16(np.int16(v))]
+    
+    # Compile at import so the first call's frame does not pay the JIT: once
+    # for read-only frombuffer input (slin/Opus), once for the writable µ-law
+    # decode scratch (numba specializes on the array's writability)
+    for _pcm in (np.frombuffer(bytes(2), dtype=np.int16), np.zeros(1, dtype=np.int16)):
+        _inbound_kernel(_pcm, 1.0, 0.0, np.empty(1, dtype=np.int16))
+    del _pcm
+    _saturate_kernel(np.zeros(1, dtype=np.float32), np.empty(1, dtype=np.int16))
+    _ulaw_gather_kernel(np.frombuffer(bytes(2), dtype=np.uint16), _ULAW_ENCODE_LUT,
+                        np.empty(1, dtype=np.uint8))
+    _ulaw_encode_kernel(np.zeros(1, dtype=np.float32), _ULAW_ENCODE_LUT,
+                        np.empty(1, dtype=np.uint8))
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize a control message for the edge function.
+    
+    Always returns str: websockets sends bytes as a binary frame, which the
+    edge function would treat as raw audio.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+_b64decode = pybase64.b64decode if PYBASE64_AVAILABLE else base64.b64decode
+
+# Exact shape of the edge's audio messages (JSON.stringify of {type, audio}),
+# matched textually so the bulk of AI audio skips the JSON parser
+_AUDIO_MSG_PREFIX = '{"type":"audio","audio":"'
+_AUDIO_MSG_SUFFIX = '"}'
+
+# Heartbeat health icons, indexed by (age < 5) + (age < 15)
+_STATUS_ICONS = ("🔴", "🟡", "🟢")
+
+
+def _tune_socket(transport: Any, sndbuf: int = SOCKET_SNDBUF_BYTES) -> None:
+    """Apply low-latency options to a voice-path TCP transport (best effort).
+    
+    asyncio already enables TCP_NODELAY on TCP transports; it is set here too
+    so the guarantee does not depend on the event-loop implementation.
+    """
+    sock = transport.get_extra_info("socket") if transport is not None else None
+    if sock is None:
+        return
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, sndbuf)
+    except OSError as e:
+        logger.debug("Socket tuning skipped: %s", e)
+
+
 # =============================================================================
 # OPUS CODEC WRAPPER
 # =============================================================================
@@ -172,12 +489,14 @@ class OpusCodec:
     """Thread-safe Opus encoder/decoder wrapper with automatic resampling."""
     
     def __init__(self, sample_rate: int = RATE_OPUS, channels: int = 1):
+        """sample_rate is the PCM side: libopus accepts 8/12/16/24/48 kHz."""
         if not OPUS_AVAILABLE:
             raise RuntimeError("opuslib not installed. Run: pip install opuslib")
         
         self.sample_rate = sample_rate
         self.channels = channels
         self.frame_size = int(sample_rate * OPUS_FRAME_MS / 1000)  # samples per frame
+        self.frame_bytes = self.frame_size * 2 * channels
         
         # Create encoder
         application = OPUS_APPLICATION_VOIP
@@ -189,6 +508,28 @@ class OpusCodec:
         # Create decoder
         self.decoder = OpusDecoder(sample_rate, channels)
         
+        # Reused resampler input/output buffers
+        self._f32_buf = np.empty(0, dtype=np.float32)
+        self._i16_buf = np.empty(0, dtype=np.int16)
+        
+        # Direct libopus entry point, encoding into one reused output buffer.
+        # opuslib's Encoder.encode allocates a ctypes array, a slice and an
+        # array.array per packet; fall back to it if the binding moves.
+        self._raw_encode = getattr(opuslib.api.encoder, "libopus_encode", None)
+        self._packet_buf = ctypes.create_string_buffer(OPUS_MAX_PACKET_BYTES)
+        
+        # Zero-padded staging frame for short input (stream edges)
+        self._enc_scratch = np.zeros(self.frame_size * channels, dtype=np.int16)
+        self._enc_scratch_ptr = self._enc_scratch.ctypes.data_as(ctypes.POINTER(ctypes.c_int16))
+        
+        # Sub-frame PCM left over from the last encode_batch call, waiting for
+        # the next chunk (AI deltas are not aligned to OPUS_FRAME_MS)
+        self._carry = b""
+        
+        # Keepalive packet for playback gaps, encoded once up front so the
+        # event loop never touches the encoder (owned by the DSP thread)
+        self.silence_packet = self.encode(bytes(self.frame_bytes))
+        
         logger.info("🎵 Opus codec initialized: %dHz, %d channels, %d samples/frame",
                    sample_rate, channels, self.frame_size)
     
@@ -205,15 +546,66 @@ class OpusCodec:
             return b""
         
         # Ensure we have exact frame size
-        samples = np.frombuffer(pcm_bytes, dtype=np.int16)
-        if len(samples) < self.frame_size:
+        if len(pcm_bytes) < self.frame_bytes:
             # Pad with zeros
-            samples = np.pad(samples, (0, self.frame_size - len(samples)))
-        elif len(samples) > self.frame_size:
+            return self._encode_padded(pcm_bytes)
+        if len(pcm_bytes) > self.frame_bytes:
             # Truncate (caller should chunk properly)
-            samples = samples[:self.frame_size]
+            pcm_bytes = pcm_bytes[:self.frame_bytes]
         
-        return self.encoder.encode(samples.tobytes(), self.frame_size)
+        return self._encode_frame(pcm_bytes)
+    
+    def _encode_padded(self, pcm_bytes: bytes) -> bytes:
+        """Encode a short frame, zero-padded in the reused staging buffer."""
+        n = len(pcm_bytes) // 2
+        self._enc_scratch[:n] = np.frombuffer(pcm_bytes, dtype=np.int16, count=n)
+        self._enc_scratch[n:] = 0
+        return self._encode_frame(self._enc_scratch)
+    
+    def _encode_frame(self, pcm: Any) -> bytes:
+        """Encode exactly one frame: PCM16 bytes, or the staging buffer."""
+        staged = pcm is self._enc_scratch
+        if self._raw_encode is None:
+            return self.encoder.encode(pcm.tobytes() if staged else pcm, self.frame_size)
+        n = self._raw_encode(
+            self.encoder.encoder_state,
+            self._enc_scratch_ptr if staged else ctypes.cast(pcm, ctypes.POINTER(ctypes.c_int16)),
+            self.frame_size,
+            self._packet_buf,
+            OPUS_MAX_PACKET_BYTES,
+        )
+        if n < 0:
+            raise opuslib.OpusError(f"Opus encoder returned {n}")
+        return ctypes.string_at(self._packet_buf, n)
+    
+    def encode_batch(self, pcm_bytes: bytes) -> List[bytes]:
+        """Encode the next chunk of a PCM16 stream into whole Opus frames.
+        
+        Full frames are sliced straight from the input bytes. A trailing
+        partial frame is carried into the next call rather than zero-padded,
+        which would put silence mid-speech after every chunk; flush() pads it
+        once the stream actually pauses.
+        """
+        if self._carry:
+            pcm_bytes = self._carry + pcm_bytes
+        frame_len = self.frame_bytes
+        full_end = len(pcm_bytes) - len(pcm_bytes) % frame_len
+        self._carry = pcm_bytes[full_end:]
+        encode = self._encode_frame
+        return [encode(pcm_bytes[i:i + frame_len])
+                for i in range(0, full_end, frame_len)]
+    
+    def flush(self) -> List[bytes]:
+        """Encode the carried partial frame, zero-padded in the staging buffer."""
+        if not self._carry:
+            return []
+        packet = self._encode_padded(self._carry)
+        self._carry = b""
+        return [packet]
+    
+    def reset(self) -> None:
+        """Drop the carried partial frame (e.g. after barge-in)."""
+        self._carry = b""
     
     def decode(self, opus_bytes: bytes) -> bytes:
         """Decode Opus frame to PCM16.
@@ -232,9 +624,9 @@ class OpusCodec:
         except Exception as e:
             logger.warning("Opus decode error: %s", e)
             # Return silence on decode error
-            return bytes(self.frame_size * 2)  # 2 bytes per sample
+            return bytes(self.frame_bytes)
     
-    def encode_with_resample(self, pcm_bytes: bytes, from_rate: int) -> bytes:
+    def encode_with_resample(self, pcm_bytes: bytes, from_rate: int) -> List[bytes]:
         """Resample PCM16 from any rate to Opus sample rate and encode.
         
         Args:
@@ -242,21 +634,22 @@ class OpusCodec:
             from_rate: Input sample rate (e.g., 24000 for AI output)
             
         Returns:
-            Opus-encoded frame
+            Opus-encoded frames covering the whole input
         """
         if from_rate == self.sample_rate:
-            return self.encode(pcm_bytes)
+            return self.encode_batch(pcm_bytes)
         
         # Resample to Opus rate
-        samples = np.frombuffer(pcm_bytes, dtype=np.int16).astype(np.float32)
+        samples = self._as_f32(np.frombuffer(pcm_bytes, dtype=np.int16))
         if samples.size == 0:
-            return b""
+            return []
         
-        g = gcd(from_rate, self.sample_rate)
-        resampled = resample_poly(samples, up=self.sample_rate // g, down=from_rate // g)
-        pcm_resampled = np.clip(resampled, -32768, 32767).astype(np.int16).tobytes()
+        pair = (from_rate, self.sample_rate)
+        up, down = _RATE_PAIRS.get(pair) or _up_down(*pair)
+        resampled = _resample_f32(samples, up, down)
+        pcm_resampled = self._saturate(resampled).tobytes()
         
-        return self.encode(pcm_resampled)
+        return self.encode_batch(pcm_resampled)
     
     def decode_with_resample(self, opus_bytes: bytes, to_rate: int) -> bytes:
         """Decode Opus and resample to target rate.
@@ -274,85 +667,205 @@ class OpusCodec:
             return pcm
         
         # Resample from Opus rate to target
-        samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+        samples = self._as_f32(np.frombuffer(pcm, dtype=np.int16))
         if samples.size == 0:
             return b""
         
-        g = gcd(self.sample_rate, to_rate)
-        resampled = resample_poly(samples, up=to_rate // g, down=self.sample_rate // g)
-        return np.clip(resampled, -32768, 32767).astype(np.int16).tobytes()
+        pair = (self.sample_rate, to_rate)
+        up, down = _RATE_PAIRS.get(pair) or _up_down(*pair)
+        resampled = _resample_f32(samples, up, down)
+        return self._saturate(resampled).tobytes()
+    
+    def _as_f32(self, pcm: np.ndarray) -> np.ndarray:
+        """Widen int16 samples into the reused float32 buffer."""
+        self._f32_buf = _grown(self._f32_buf, pcm.size)
+        buf = self._f32_buf[:pcm.size]
+        np.copyto(buf, pcm)
+        return buf
+    
+    def _saturate(self, samples: np.ndarray) -> np.ndarray:
+        """Clip float samples into the reused int16 buffer."""
+        self._i16_buf = _grown(self._i16_buf, samples.size)
+        return _to_int16(samples, out=self._i16_buf[:samples.size])
 
 
 # =============================================================================
 # AUDIO PROCESSING
 # =============================================================================
 
+class StreamResampler:
+    """Polyphase resampler that carries filter history across chunks.
+    
+    Resampling each TTS chunk on its own zero-pads both edges, which leaves a
+    small transient at every chunk boundary. This keeps the input tail and
+    the output phase, so a stream fed in pieces comes out the same as if it
+    had been resampled in one go (delayed by half the filter length, about
+    1 ms). The FIR is the same one _resample_f32 uses.
+    """
+    
+    def __init__(self, up: int, down: int):
+        self.up = up
+        self.down = down
+        taps = _fir_taps(up, down)
+        self._delay = (taps.size - 1) // 2  # Filter centre, upsampled samples
+        self._history_len = -(-taps.size // up) + down
+        # Filter pre-padded with p zeros (p = output phase), built on first use
+        self._phase_taps: List[Optional[np.ndarray]] = [None] * down
+        self.reset()
+    
+    def reset(self) -> None:
+        """Forget history (e.g. after barge-in, when the next audio is unrelated)."""
+        self._history = np.zeros(0, dtype=np.float32)
+        self._consumed = 0  # Input samples seen so far
+        self._next_out = 0  # Index of the next output sample
+    
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample the next chunk of float32 samples; returns float32."""
+        up, down = self.up, self.down
+        base = self._consumed - self._history.size  # Input index of x[0]
+        x = np.concatenate((self._history, samples)) if self._history.size else samples
+        self._consumed += samples.size
+        
+        # Outputs whose filter centre falls on input already received
+        n_end = max(self._next_out, -(-(self._consumed * up - self._delay) // down))
+        count = n_end - self._next_out
+        self._history = x[-self._history_len:].copy()
+        if count == 0:
+            return np.zeros(0, dtype=np.float32)
+        
+        # Upsampled position of the first output within x, shifted onto
+        # upfirdn's decimation grid by pre-padding the filter
+        first = self._next_out * down + self._delay - base * up
+        phase = -first % down
+        h = self._phase_taps[phase]
+        if h is None:
+            h = np.concatenate((np.zeros(phase, dtype=np.float32),
+                                _fir_taps(up, down) * np.float32(up)))
+            h.setflags(write=False)
+            self._phase_taps[phase] = h
+        start = (first + phase) // down
+        self._next_out = n_end
+        return upfirdn(h, x, up, down)[start:start + count]
+
+
 class AudioProcessor:
     """Encapsulates all DSP operations for clean separation of concerns."""
     
     def __init__(self):
         self.last_gain: float = 1.0
+        self._agc_energy: float = 0.0  # EWMA of boosted mean-square level
+        self._agc_active: bool = False  # Previous frame's boosted RMS was above AGC_FLOOR_RMS
+        self._rms_log_counter: int = 0
+        # Scratch buffers reused across frames (grown on demand). Outbound
+        # ones belong to the DSP worker, inbound ones to the event loop.
+        self._f32_buf = np.empty(0, dtype=np.float32)
+        self._i16_buf = np.empty(0, dtype=np.int16)
+        self._in_f32_buf = np.empty(0, dtype=np.float32)
+        self._in_i16_buf = np.empty(0, dtype=np.int16)
+        self._preemph_buf = np.empty(0, dtype=np.float32)
+        self._decode_buf = np.empty(0, dtype=np.int16)  # µ-law frames decoded in place
+        # AI → Asterisk resamplers keyed by (up, down), history kept across chunks
+        self._out_resamplers: Dict[Tuple[int, int], StreamResampler] = {}
+        
+        # Created by ensure_opus() once a call actually locks to Opus, so
+        # µ-law/slin calls never allocate libopus encoder/decoder state
         self.opus_codec: Optional[OpusCodec] = None
+        self._opus_unavailable = not OPUS_AVAILABLE
         
-        # Initialize Opus if available
-        if OPUS_AVAILABLE:
+        # Outbound resample/encode runs here instead of on the event loop.
+        # One worker keeps frames (and the stateful Opus encoder) in order;
+        # upfirdn releases the GIL inside its C core.
+        self._dsp_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dsp")
+    
+    def ensure_opus(self) -> Optional[OpusCodec]:
+        """Return the Opus codec, creating it on first use (None if unusable)."""
+        if self.opus_codec is None and not self._opus_unavailable:
             try:
-                self.opus_codec = OpusCodec(RATE_OPUS, channels=1)
+                self.opus_codec = OpusCodec(OPUS_PCM_RATE, channels=1)
             except Exception as e:
                 logger.warning("⚠️ Opus init failed: %s (falling back to PCM)", e)
-                self.opus_codec = None
+                self._opus_unavailable = True
+        return self.opus_codec
+    
+    @staticmethod
+    def _ulaw_to_linear_arr(ulaw: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Decode a uint8 µ-law array to an int16 PCM array (into `out` if given)."""
+        # take() already beats a JIT call on 160-byte frames; only encode,
+        # which sees whole TTS chunks, goes through numba
+        return _ULAW_DECODE_LUT.take(ulaw, out=out)
+    
+    @staticmethod
+    def _linear_to_ulaw_arr(pcm: np.ndarray) -> np.ndarray:
+        """Encode an int16 PCM array to a uint8 µ-law array."""
+        if NUMBA_AVAILABLE:
+            out = np.empty(pcm.size, dtype=np.uint8)
+            _ulaw_gather_kernel(pcm.view(np.uint16), _ULAW_ENCODE_LUT, out)
+            return out
+        return _ULAW_ENCODE_LUT.take(pcm.view(np.uint16))
     
     @staticmethod
-    def ulaw_to_linear(ulaw_bytes: bytes) -> bytes:
+    def _resample_arr(samples: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+        """Polyphase-resample an int16 PCM array, returning int16."""
+        pair = (from_rate, to_rate)
+        up, down = _RATE_PAIRS.get(pair) or _up_down(*pair)
+        resampled = _resample_f32(samples.astype(np.float32), up, down)
+        return _to_int16(resampled)
+    
+    def _as_f32(self, pcm: np.ndarray) -> np.ndarray:
+        """Widen int16 samples into the reused float32 buffer."""
+        self._f32_buf = _grown(self._f32_buf, pcm.size)
+        buf = self._f32_buf[:pcm.size]
+        np.copyto(buf, pcm)
+        return buf
+    
+    def _saturate(self, samples: np.ndarray) -> np.ndarray:
+        """Clip float samples into the reused int16 buffer."""
+        self._i16_buf = _grown(self._i16_buf, samples.size)
+        return _to_int16(samples, out=self._i16_buf[:samples.size])
+    
+    @classmethod
+    def ulaw_to_linear(cls, ulaw_bytes: bytes) -> bytes:
         """Decode µ-law to 16-bit linear PCM."""
         if not ulaw_bytes:
             return b""
-        ulaw = np.frombuffer(ulaw_bytes, dtype=np.uint8)
-        ulaw = ~ulaw
-        sign = ulaw & 0x80
-        exponent = (ulaw >> 4) & 0x07
-        mantissa = ulaw & 0x0F
-        
-        sample = (mantissa.astype(np.int32) << 3) + ULAW_BIAS
-        sample <<= exponent
-        sample -= ULAW_BIAS
-        pcm = np.where(sign != 0, -sample, sample).astype(np.int16)
-        return pcm.tobytes()
+        if AUDIOOP_AVAILABLE:
+            return audioop.ulaw2lin(ulaw_bytes, 2)  # Same G.711 table, in C
+        return cls._ulaw_to_linear_arr(np.frombuffer(ulaw_bytes, dtype=np.uint8)).tobytes()
     
-    @staticmethod
-    def linear_to_ulaw(pcm_bytes: bytes) -> bytes:
+    @classmethod
+    def linear_to_ulaw(cls, pcm_bytes: bytes) -> bytes:
         """Encode 16-bit linear PCM to µ-law."""
         if not pcm_bytes:
             return b""
-        pcm = np.frombuffer(pcm_bytes, dtype=np.int16).astype(np.int32)
-        sign = np.where(pcm < 0, 0x80, 0)
-        pcm = np.clip(np.abs(pcm), 0, ULAW_CLIP) + ULAW_BIAS
-        
-        exponent = np.clip(np.floor(np.log2(np.maximum(pcm, 1))).astype(np.int32) - 7, 0, 7)
-        mantissa = (pcm >> (exponent + 3)) & 0x0F
-        ulaw = (~(sign | (exponent << 4) | mantissa)) & 0xFF
-        return ulaw.astype(np.uint8).tobytes()
+        return cls._linear_to_ulaw_arr(np.frombuffer(pcm_bytes, dtype=np.int16)).tobytes()
     
     @staticmethod
-    def pre_emphasis(samples: np.ndarray, coeff: float = 0.95) -> np.ndarray:
-        """Apply pre-emphasis filter to boost high-frequency consonants."""
+    def pre_emphasis(samples: np.ndarray, coeff: float = 0.95,
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Apply pre-emphasis filter to boost high-frequency consonants.
+        
+        Writes into `out` when given (same shape, must not alias `samples`).
+        """
         if samples.size == 0:
             return samples
-        return np.append(samples[0], samples[1:] - coeff * samples[:-1])
+        if out is None:
+            out = np.empty_like(samples)
+        out[0] = samples[0]
+        np.multiply(samples[:-1], coeff, out=out[1:])
+        np.subtract(samples[1:], out[1:], out=out[1:])
+        return out
     
-    @staticmethod
-    def resample(audio_bytes: bytes, from_rate: int, to_rate: int) -> bytes:
+    @classmethod
+    def resample(cls, audio_bytes: bytes, from_rate: int, to_rate: int) -> bytes:
         """High-quality polyphase resampling."""
         if from_rate == to_rate or not audio_bytes:
             return audio_bytes
         
-        samples = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32)
+        samples = np.frombuffer(audio_bytes, dtype=np.int16)
         if samples.size == 0:
             return b""
         
-        g = gcd(from_rate, to_rate)
-        resampled = resample_poly(samples, up=to_rate // g, down=from_rate // g)
-        return np.clip(resampled, -32768, 32767).astype(np.int16).tobytes()
+        return cls._resample_arr(samples, from_rate, to_rate).tobytes()
     
     def decode_opus(self, opus_bytes: bytes) -> Tuple[bytes, int]:
         """Decode Opus to PCM16.
@@ -364,14 +877,26 @@ class AudioProcessor:
             raise RuntimeError("Opus codec not available")
         
         pcm = self.opus_codec.decode(opus_bytes)
-        return pcm, RATE_OPUS
+        return pcm, self.opus_codec.sample_rate
     
     def encode_opus(self, pcm_bytes: bytes, from_rate: int) -> bytes:
-        """Encode PCM16 to Opus with automatic resampling."""
+        """Encode PCM16 to Opus with automatic resampling.
+        
+        Returns the packets already framed for AudioSocket (one header per
+        packet), ready to be written as-is.
+        """
         if not self.opus_codec:
             raise RuntimeError("Opus codec not available")
         
-        return self.opus_codec.encode_with_resample(pcm_bytes, from_rate)
+        return self._frame_packets(self.opus_codec.encode_with_resample(pcm_bytes, from_rate))
+    
+    @staticmethod
+    def _frame_packets(packets: List[bytes]) -> bytes:
+        """Join Opus packets, each behind its own AudioSocket header."""
+        return b"".join(
+            part for packet in packets
+            for part in (_AUDIOSOCKET_HEADER.pack(MSG_AUDIO, len(packet)), packet)
+        )
     
     def process_inbound(self, pcm_bytes: bytes, call_id: str = "") -> bytes:
         """
@@ -382,40 +907,74 @@ class AudioProcessor:
         if not pcm_bytes or len(pcm_bytes) < 4:
             return pcm_bytes
         
-        samples = np.frombuffer(pcm_bytes, dtype=np.int16).astype(np.float32)
-        if samples.size == 0:
-            return pcm_bytes
-        
-        # DEBUG: Track input RMS before any processing
-        input_rms = float(np.sqrt(np.mean(samples ** 2)))
+        output_samples = self._process_inbound_pcm(
+            np.frombuffer(pcm_bytes, dtype=np.int16), call_id
+        )
+        return pcm_bytes if output_samples is None else output_samples.tobytes()
+    
+    def _process_inbound_pcm(self, pcm: np.ndarray, call_id: str) -> Optional[np.ndarray]:
+        """Inbound DSP on an int16 array; None means pass the input through."""
+        # Fast path: (near-)silent frames pass through untouched. Checked on
+        # int16 with max/min (np.abs would wrap -32768). Even boosted, such a
+        # frame stays under AGC_FLOOR_RMS, so last_gain would not move anyway.
+        if max(int(pcm.max()), -int(pcm.min())) < SILENCE_PEAK_THRESHOLD:
+            self._agc_active = False
+            return None
+        
+        boost = VOLUME_BOOST_FACTOR if ENABLE_VOLUME_BOOST else 1.0
+        # Steps 1+2: Volume boost and AGC gain in one multiply. The gain was
+        # settled on previous frames (one-frame latency is inaudible at 20ms),
+        # and like the per-frame AGC it only applies above AGC_FLOOR_RMS, so
+        # line noise in pauses gets the fixed boost, not the speech gain.
+        gain = boost * self.last_gain if ENABLE_AGC and self._agc_active else boost
+        
+        self._in_i16_buf = _grown(self._in_i16_buf, pcm.size)
+        output_samples = self._in_i16_buf[:pcm.size]
+        if NUMBA_AVAILABLE:
+            # Energy, gain, pre-emphasis and clip in a single pass
+            energy = _inbound_kernel(pcm, gain, PRE_EMPHASIS_COEFF, output_samples)
+        else:
+            self._in_f32_buf = _grown(self._in_f32_buf, pcm.size)
+            samples = self._in_f32_buf[:pcm.size]
+            np.copyto(samples, pcm)
+            
+            # Single energy pass over the input; the boosted level follows
+            # linearly, so AGC does not need a second traversal
+            energy = float(np.dot(samples, samples))
+            samples *= gain
+            
+            # Step 3: Pre-emphasis for consonant clarity, into reused scratch
+            self._preemph_buf = _grown(self._preemph_buf, samples.size)
+            samples = self.pre_emphasis(samples, PRE_EMPHASIS_COEFF,
+                                        out=self._preemph_buf[:samples.size])
+            
+            # The scratch is ours, safe to clip in place
+            _to_int16(samples, out=output_samples)
         
-        # Step 1: Volume boost for quiet telephony lines
-        if ENABLE_VOLUME_BOOST:
-            samples *= VOLUME_BOOST_FACTOR
+        input_ms = energy / pcm.size
+        input_rms = float(np.sqrt(input_ms))
         
-        # Step 2: AGC to normalize levels
+        # AGC update for the next frame from an EWMA of the boosted energy.
+        # The floor is checked on this frame's own level: an EWMA still
+        # decaying from speech must not push the gain up on noise.
         if ENABLE_AGC:
-            rms = float(np.sqrt(np.mean(samples ** 2)))
-            if rms > AGC_FLOOR_RMS:
+            self._agc_energy = (AGC_ENERGY_DECAY * self._agc_energy
+                                + (1.0 - AGC_ENERGY_DECAY) * input_ms * boost * boost)
+            self._agc_active = input_rms * boost > AGC_FLOOR_RMS
+            if self._agc_active:
+                rms = float(np.sqrt(self._agc_energy))
                 target_gain = float(np.clip(TARGET_RMS / rms, AGC_MIN_GAIN, AGC_MAX_GAIN))
                 self.last_gain += AGC_SMOOTHING * (target_gain - self.last_gain)
-                samples *= self.last_gain
-        
-        # Step 3: Pre-emphasis for consonant clarity
-        samples = self.pre_emphasis(samples, PRE_EMPHASIS_COEFF)
-        
-        output_samples = np.clip(samples, -32768, 32767).astype(np.int16)
-        output_rms = float(np.sqrt(np.mean(output_samples.astype(np.float32) ** 2)))
         
         # Log RMS periodically (every ~2 seconds = 100 frames at 20ms each)
-        if not hasattr(self, '_rms_log_counter'):
-            self._rms_log_counter = 0
         self._rms_log_counter += 1
         if self._rms_log_counter % 100 == 0 and input_rms > 5:
+            out = output_samples.astype(np.float32)
+            output_rms = float(np.sqrt(np.dot(out, out) / out.size))
             logger.info("[%s] 📈 DSP: in_rms=%.0f → out_rms=%.0f (gain=%.1fx)", 
                        call_id, input_rms, output_rms, self.last_gain)
         
-        return output_samples.tobytes()
+        return output_samples
     
     def process_outbound(self, ai_audio: bytes, from_rate: int, to_rate: int, 
                          to_codec: str) -> bytes:
@@ -428,14 +987,116 @@ class AudioProcessor:
             # Encode to Opus (handles resampling internally)
             return self.encode_opus(ai_audio, from_rate)
         
-        # Resample from AI rate to Asterisk rate
-        resampled = self.resample(ai_audio, from_rate, to_rate)
+        if not ai_audio:
+            return ai_audio
+        
+        # Same-rate PCM needs no conversion at all: hand the input back as-is
+        if from_rate == to_rate and to_codec != "ulaw":
+            return ai_audio
+        
+        # Stay in NumPy between stages; serialise to bytes exactly once
+        samples = np.frombuffer(ai_audio, dtype=np.int16)
+        if from_rate != to_rate:
+            # Resample from AI rate to Asterisk rate
+            pair = (from_rate, to_rate)
+            up, down = _RATE_PAIRS.get(pair) or _up_down(*pair)
+            resampler = self._out_resamplers.get((up, down))
+            if resampler is None:
+                resampler = self._out_resamplers[(up, down)] = StreamResampler(up, down)
+            resampled = resampler.process(self._as_f32(samples))
+            if to_codec == "ulaw" and NUMBA_AVAILABLE:
+                # Saturate and encode straight from float, no int16 pass
+                ulaw = np.empty(resampled.size, dtype=np.uint8)
+                _ulaw_encode_kernel(resampled, _ULAW_ENCODE_LUT, ulaw)
+                return ulaw.tobytes()
+            samples = self._saturate(resampled)
         
         # Encode to µ-law if needed
         if to_codec == "ulaw":
-            return self.linear_to_ulaw(resampled)
+            return self._linear_to_ulaw_arr(samples).tobytes()
+        
+        return samples.tobytes()
+    
+    def inbound_decoder(self, codec: str) -> Optional[Callable[[bytes], np.ndarray]]:
+        """Decode function turning an Asterisk frame into int16 samples (None for PCM16).
+        
+        Resolved once per format lock so frames skip the codec comparison.
+        """
+        if codec == "opus":
+            return self._decode_opus_frame
+        if codec == "ulaw":
+            return self._decode_ulaw_frame
+        return None
+    
+    def _decode_opus_frame(self, payload: bytes) -> np.ndarray:
+        # Decode Opus to PCM at the AI rate (libopus converts internally
+        # when the codec runs at RATE_AI, so no Python resample)
+        return np.frombuffer(self.opus_codec.decode_with_resample(payload, RATE_AI),
+                             dtype=np.int16)
+    
+    def _decode_ulaw_frame(self, payload: bytes) -> np.ndarray:
+        if AUDIOOP_AVAILABLE:
+            # One C call (~0.1us a frame) beats the take() dispatch below
+            return np.frombuffer(audioop.ulaw2lin(payload, 2), dtype=np.int16)
+        # LUT straight into scratch; the DSP reads it without a bytes round trip
+        ulaw = np.frombuffer(payload, dtype=np.uint8)
+        self._decode_buf = _grown(self._decode_buf, ulaw.size)
+        return self._ulaw_to_linear_arr(ulaw, out=self._decode_buf[:ulaw.size])
+    
+    def process_inbound_frame(self, payload: bytes,
+                              decode: Optional[Callable[[bytes], np.ndarray]],
+                              call_id: str = "") -> bytes:
+        """Decode one Asterisk frame to PCM16 and run the inbound DSP pipeline."""
+        if decode is None:
+            return self.process_inbound(payload, call_id)
+        pcm = decode(payload)
+        if pcm.size < 2:
+            return pcm.tobytes()
+        output_samples = self._process_inbound_pcm(pcm, call_id)
+        return (pcm if output_samples is None else output_samples).tobytes()
+    
+    async def process_inbound_async(self, payload: bytes,
+                                    decode: Optional[Callable[[bytes], np.ndarray]],
+                                    call_id: str = "") -> bytes:
+        """Run process_inbound_frame on the DSP worker thread.
+        
+        Only for Opus frames: the worker owns the codec and its scratch
+        buffers. PCM/µ-law frames are cheaper inline than an executor hop.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._dsp_pool, self.process_inbound_frame, payload, decode, call_id
+        )
+    
+    async def process_outbound_async(self, ai_audio: bytes, from_rate: int, to_rate: int,
+                                     to_codec: str) -> bytes:
+        """Run process_outbound on the DSP worker thread."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._dsp_pool, self.process_outbound, ai_audio, from_rate, to_rate, to_codec
+        )
+    
+    async def flush_outbound_async(self) -> bytes:
+        """Framed Opus packet for the encoder's carried partial frame (b"" if none).
         
-        return resampled
+        Runs on the DSP worker, behind any outbound chunks already queued.
+        """
+        def flush() -> bytes:
+            if not self.opus_codec:
+                return b""
+            return self._frame_packets(self.opus_codec.flush())
+        return await asyncio.get_running_loop().run_in_executor(self._dsp_pool, flush)
+    
+    def reset_outbound(self) -> None:
+        """Drop outbound resampler history and Opus carry (queued behind in-flight DSP work)."""
+        def reset() -> None:
+            for resampler in self._out_resamplers.values():
+                resampler.reset()
+            if self.opus_codec:
+                self.opus_codec.reset()
+        self._dsp_pool.submit(reset)
+    
+    def close(self) -> None:
+        """Stop the DSP worker thread."""
+        self._dsp_pool.shutdown(wait=False, cancel_futures=True)
 
 
 # =============================================================================
@@ -459,9 +1120,13 @@ class CallEndedException(Exception):
 # CALL STATE
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class CallState:
-    """Tracks all state for a single call session."""
+    """Tracks all state for a single call session.
+    
+    Slotted: fields are touched on every frame, so attribute access is a
+    fixed offset rather than a __dict__ lookup. Requires Python 3.10+.
+    """
     call_id: str
     phone: str = "Unknown"
     
@@ -470,6 +1135,9 @@ class CallState:
     ast_rate: int = RATE_ULAW     # 8000, 16000, or 48000
     ast_frame_bytes: int = 160    # varies by codec
     
+    # Timestamps (format_lock_time, last_*) are time.monotonic() seconds:
+    # only ever compared with each other, immune to wall-clock steps
+    
     # Format detection state
     format_locked: bool = False
     format_lock_time: float = 0.0
@@ -477,14 +1145,13 @@ class CallState:
     # WebSocket state
     ws_connected: bool = False
     reconnect_attempts: int = 0
-    last_ws_activity: float = field(default_factory=time.time)
+    last_ws_activity: float = field(default_factory=time.monotonic)
     current_ws_url: str = field(default_factory=lambda: WS_URL)
     init_sent: bool = False
     call_formally_ended: bool = False
     
     # Asterisk state
-    last_asterisk_send: float = field(default_factory=time.time)
-    last_asterisk_recv: float = field(default_factory=time.time)
+    last_asterisk_recv: float = field(default_factory=time.monotonic)
     
     # Opus frame buffer (for accumulating partial frames)
     opus_buffer: bytes = b""
@@ -492,6 +1159,7 @@ class CallState:
     # Metrics
     frames_sent: int = 0
     frames_received: int = 0
+    frames_dropped: int = 0  # Oldest chunks evicted from the bounded deques
     keepalive_count: int = 0
     handoff_count: int = 0
 
@@ -503,11 +1171,16 @@ class CallState:
 class TaxiBridge:
     """Main bridge connecting Asterisk AudioSocket to AI Edge Function."""
     
-    VERSION = "7.7"
+    VERSION = "7.7.1"
     
     def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
         self.reader = reader
         self.writer = writer
+        # Small buffers on the Asterisk side: playback is paced in real time,
+        # so anything queued past a few frames is only added latency. drain()
+        # starts waiting at the same mark instead of asyncio's 64 KiB default.
+        _tune_socket(writer.transport, ASTERISK_SNDBUF_BYTES)
+        writer.transport.set_write_buffer_limits(high=ASTERISK_SNDBUF_BYTES)
         self.ws: Optional[websockets.WebSocketClientProtocol] = None
         self.running: bool = True
         
@@ -517,6 +1190,58 @@ class TaxiBridge:
         # Bounded queues for memory safety
         self.audio_queue: Deque[bytes] = deque(maxlen=AUDIO_QUEUE_MAXLEN)
         self.pending_buffer: Deque[bytes] = deque(maxlen=PENDING_BUFFER_MAXLEN)
+        # Set on barge-in: queue_to_asterisk drops the audio it has already
+        # pulled off audio_queue, not just what is still queued
+        self._playback_flush: bool = False
+        
+        # The audio pipes live for the whole call; a reconnect only swaps self.ws.
+        # _ws_ready gates ai_to_queue between sockets, and the pipes report how a
+        # socket ended (redirect, close, call end; None = stop) to run().
+        self._ws_ready = asyncio.Event()
+        self._ws_events: "asyncio.Queue[Optional[BaseException]]" = asyncio.Queue()
+        
+        # Keepalive silence frame, keyed by (codec, frame_bytes)
+        self._silence_cache: Tuple[str, int, bytes] = ("", 0, b"")
+        
+        # Values derived from the locked format (rebuilt on format lock):
+        # AudioSocket header for fixed-size PCM frames and the inbound
+        # frame decoder (None when frames are already PCM16)
+        self._audio_header: bytes = b""
+        self._inbound_decode: Optional[Callable[[bytes], np.ndarray]] = None
+        self._needs_detect: bool = True  # Cleared once the format locks
+        self._format_gen: int = 0  # Bumped on every format lock
+        self._refresh_format_cache()
+        
+        # JSON prefixes for the recurring control messages; call_id is fixed
+        # for the lifetime of the bridge, so only the timestamp varies
+        call_id_json = _json_dumps(self.state.call_id)
+        self._keepalive_ack_prefix = f'{{"type":"keepalive_ack","call_id":{call_id_json},"timestamp":'
+        self._ping_prefix = f'{{"type":"ping","call_id":{call_id_json},"timestamp":'
+        
+        # Playback backpressure state (see queue_to_asterisk watermarks)
+        self._flow_paused: bool = False
+        
+        # Rate limit for the locked-format frame size log (monotonic seconds)
+        self._last_size_warning: float = 0.0
+        
+        # Set once the edge has sent base64 audio despite binary_audio_only
+        self._json_audio_seen: bool = False
+        
+        # Edge JSON message type -> handler (one dict lookup per message)
+        self._handlers: Dict[str, Callable[[dict], Awaitable[None]]] = {
+            "audio": self._on_json_audio,
+            "address_tts": self._on_audio,
+            "transcript": self._on_transcript,
+            "speech_started": self._on_speech,
+            "speech_stopped": self._on_speech,
+            "ai_interrupted": self._on_ai_interrupted,
+            "redirect": self._on_redirect,
+            "session.handoff": self._on_handoff,
+            "call_ended": self._on_call_ended,
+            "hangup": self._on_hangup,
+            "keepalive": self._on_keepalive,
+            "error": self._on_error,
+        }
     
     # -------------------------------------------------------------------------
     # FORMAT DETECTION
@@ -528,37 +1253,31 @@ class TaxiBridge:
         Opus frames have specific TOC (Table of Contents) byte patterns.
         First byte encodes: config (5 bits) + stereo (1 bit) + frames per packet (2 bits)
         """
-        if len(payload) < 2:
-            return False
-
-        # AudioSocket PCM frames are commonly exactly 160/320/640 bytes (20ms)
-        # and must NEVER be mistaken for Opus.
-        if len(payload) in (160, 320, 640):
-            return False
-        
-        # Opus frames are typically variable length but have recognizable patterns
-        # PCM would be even length and have predictable sizes (320, 640, etc.)
-        # Opus is compressed so sizes vary but are usually smaller than PCM equivalent
-        toc = payload[0]
-        
-        # Check for valid config values (0-31 in upper 5 bits)
-        config = (toc >> 3) & 0x1F
-        
-        # Config 0-11 are narrow/medium/wideband SILK modes
-        # Config 12-15 are hybrid modes
-        # Config 16-31 are CELT modes
-        # All are valid Opus configurations
-        
-        # Additional heuristic: Opus frames for 20ms @ 32kbps are typically 80-120 bytes
-        # 48kHz stereo PCM for 20ms would be 3840 bytes, mono 1920 bytes
-        # If we get frames much smaller than PCM equivalent, likely Opus
-        opus_20ms_mono_pcm_size = int(RATE_OPUS * 0.02 * 2)  # 1920 bytes
-        
-        # If payload is much smaller than the PCM size, probably Opus
-        if len(payload) < opus_20ms_mono_pcm_size // 4:
-            return True
-        
-        return False
+        # Every TOC value is a valid configuration (config 0-11 SILK, 12-15
+        # hybrid, 16-31 CELT), so the TOC byte cannot rule anything out; the
+        # decision rests on size. AudioSocket PCM frames are exactly
+        # 160/320/640 bytes and must NEVER be mistaken for Opus, and Opus
+        # frames (20ms @ 32kbps ≈ 80-120 bytes) sit far below PCM size.
+        n = len(payload)
+        return 2 <= n < OPUS_MAX_DETECT_BYTES and n not in PCM_FRAME_SIZES
+    
+    def _refresh_format_cache(self) -> None:
+        """Rebuild values derived from the (newly locked) Asterisk format."""
+        self._format_gen += 1
+        self._audio_header = _AUDIOSOCKET_HEADER.pack(MSG_AUDIO, self.state.ast_frame_bytes)
+        self._inbound_decode = self.audio_processor.inbound_decoder(self.state.ast_codec)
+        self._needs_detect = not self.state.format_locked
+    
+    def _note_frame_size_change(self, frame_len: int) -> None:
+        """Debug-log (rate limited) a PCM frame size that differs from the lock."""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        now = time.monotonic()
+        if now - self._last_size_warning > 10:
+            logger.debug("[%s] 📊 Frame size %d→%d (ignoring, locked to %s@%dHz)",
+                       self.state.call_id, self.state.ast_frame_bytes, frame_len,
+                       self.state.ast_codec, self.state.ast_rate)
+            self._last_size_warning = now
     
     async def _detect_format(self, frame_len: int, payload: bytes = b"") -> None:
         """
@@ -574,43 +1293,37 @@ class TaxiBridge:
         audio using the locked format. This prevents connection drops caused by
         Asterisk frame size oscillation (320↔640 bytes).
         """
-        CANONICAL_SIZES = {160, 320, 640}
-        
         # =====================================================================
         # PERMANENT LOCK: Once locked, ignore ALL frame size changes
         # This is the key fix for connection stability
         # =====================================================================
+        # (asterisk_to_ai stops calling in once _needs_detect clears)
         if self.state.format_locked:
-            if frame_len != self.state.ast_frame_bytes:
-                # Only log occasionally to avoid spam
-                if not hasattr(self, '_last_size_warning') or time.time() - self._last_size_warning > 10:
-                    logger.debug("[%s] 📊 Frame size %d→%d (ignoring, locked to %s@%dHz)",
-                               self.state.call_id, self.state.ast_frame_bytes, frame_len,
-                               self.state.ast_codec, self.state.ast_rate)
-                    self._last_size_warning = time.time()
             # DON'T update ast_frame_bytes - keep it stable for processing
             return
         
         # Check for Opus first (variable size, special detection)
-        # Only do this if Opus is enabled AND we have a decoder.
+        # Only do this if Opus is enabled AND we have a decoder (created here,
+        # on the first frame that looks like Opus).
         if (
             payload
             and PREFER_OPUS
-            and self.audio_processor.opus_codec
-            and frame_len not in CANONICAL_SIZES
+            and frame_len not in PCM_FRAME_SIZES
             and self._is_opus_frame(payload)
+            and self.audio_processor.ensure_opus()
         ):
             self.state.ast_codec = "opus"
             self.state.ast_rate = RATE_OPUS
             self.state.ast_frame_bytes = frame_len
             self.state.format_locked = True
-            self.state.format_lock_time = time.time()
+            self.state.format_lock_time = time.monotonic()
+            self._refresh_format_cache()
             logger.info("[%s] 🎵 Format LOCKED: Opus @ %dHz (variable frames)",
                        self.state.call_id, RATE_OPUS)
             
             # Notify edge function
             if self.ws and self.state.ws_connected:
-                await self.ws.send(json.dumps({
+                await self.ws.send(_json_dumps({
                     "type": "update_format",
                     "call_id": self.state.call_id,
                     "inbound_format": "opus",
@@ -633,7 +1346,8 @@ class TaxiBridge:
                 self.state.ast_rate = RATE_SLIN16
                 self.state.ast_frame_bytes = frame_len
                 self.state.format_locked = True
-                self.state.format_lock_time = time.time()
+                self.state.format_lock_time = time.monotonic()
+                self._refresh_format_cache()
                 logger.info(
                     "[%s] 🔊 Format LOCKED: slin16 @ %dHz (forced, %d bytes/frame)",
                     self.state.call_id,
@@ -643,7 +1357,7 @@ class TaxiBridge:
 
                 # Notify edge function of format
                 if self.ws and self.state.ws_connected:
-                    await self.ws.send(json.dumps({
+                    await self.ws.send(_json_dumps({
                         "type": "update_format",
                         "call_id": self.state.call_id,
                         "inbound_format": "slin16",
@@ -657,7 +1371,8 @@ class TaxiBridge:
             self.state.ast_rate = RATE_ULAW
             self.state.ast_frame_bytes = frame_len
             self.state.format_locked = True
-            self.state.format_lock_time = time.time()
+            self.state.format_lock_time = time.monotonic()
+            self._refresh_format_cache()
             logger.info("[%s] 🔊 Format LOCKED: ulaw @ %dHz (forced)", 
                        self.state.call_id, RATE_ULAW)
             return
@@ -681,7 +1396,8 @@ class TaxiBridge:
         
         self.state.ast_frame_bytes = frame_len
         self.state.format_locked = True
-        self.state.format_lock_time = time.time()
+        self.state.format_lock_time = time.monotonic()
+        self._refresh_format_cache()
         
         # Log format detection
         logger.info("[%s] 🔊 Format LOCKED: %s @ %dHz (%d bytes/frame)", 
@@ -691,7 +1407,7 @@ class TaxiBridge:
         # Notify edge function of format
         if self.ws and self.state.ws_connected:
             inbound_fmt = self.state.ast_codec
-            await self.ws.send(json.dumps({
+            await self.ws.send(_json_dumps({
                 "type": "update_format",
                 "call_id": self.state.call_id,
                 "inbound_format": inbound_fmt,
@@ -704,14 +1420,19 @@ class TaxiBridge:
     
     async def connect_websocket(self, url: Optional[str] = None,
                                 init_data: Optional[dict] = None) -> bool:
-        """Connect to WebSocket with exponential backoff."""
+        """Connect to WebSocket with capped, jittered exponential backoff."""
         target_url = url or self.state.current_ws_url
         
         while self.state.reconnect_attempts < MAX_RECONNECT_ATTEMPTS and self.running:
             try:
-                # Exponential backoff
-                if self.state.reconnect_attempts > 0:
-                    delay = RECONNECT_BASE_DELAY_S * (2 ** (self.state.reconnect_attempts - 1))
+                # Exponential backoff. The first reconnect after a drop goes
+                # straight out (the caller is mid-sentence); later attempts are
+                # capped and jittered so calls dropped by one edge outage do
+                # not all retry in lockstep.
+                if self.state.reconnect_attempts > 1:
+                    delay = min(RECONNECT_MAX_DELAY_S,
+                                RECONNECT_BASE_DELAY_S * (2 ** (self.state.reconnect_attempts - 2)))
+                    delay *= random.uniform(0.5, 1.5)
                     logger.info("[%s] 🔄 Reconnecting in %.1fs (attempt %d/%d)", 
                                self.state.call_id, delay, 
                                self.state.reconnect_attempts + 1, MAX_RECONNECT_ATTEMPTS)
@@ -724,10 +1445,16 @@ class TaxiBridge:
                         ping_timeout=WS_PING_TIMEOUT,
                         close_timeout=5,
                         max_queue=32,
+                        # Audio is near-incompressible; skip per-message deflate
+                        compression=None,
+                        # Let the transport absorb short stalls instead of
+                        # making send() wait on drain at the 32 KiB default
+                        write_limit=WS_WRITE_LIMIT,
                     ),
                     timeout=10.0,
                 )
                 self.state.current_ws_url = target_url
+                _tune_socket(getattr(self.ws, "transport", None))
                 
                 # Send appropriate init message
                 if init_data:
@@ -737,8 +1464,9 @@ class TaxiBridge:
                         **init_data,
                         "call_id": self.state.call_id,
                         "phone": None if self.state.phone == "Unknown" else self.state.phone,
+                        "binary_audio_only": True,
                     }
-                    await self.ws.send(json.dumps(payload))
+                    await self.ws.send(_json_dumps(payload))
                     logger.info("[%s] 🔀 Sent %s init", self.state.call_id,
                                "resume" if init_data.get("resume") else "redirect")
                     self.state.init_sent = True
@@ -751,31 +1479,42 @@ class TaxiBridge:
                         "call_id": self.state.call_id,
                         "phone": None if self.state.phone == "Unknown" else self.state.phone,
                         "reconnect": True,
+                        "binary_audio_only": True,
                         "inbound_format": inbound_fmt,
                         "inbound_sample_rate": self.state.ast_rate,
                     }
-                    await self.ws.send(json.dumps(payload))
+                    await self.ws.send(_json_dumps(payload))
                     logger.info("[%s] 🔁 Sent reconnect init", self.state.call_id)
                 
-                self.state.ws_connected = True
-                self.state.last_ws_activity = time.time()
+                self.state.last_ws_activity = time.monotonic()
                 self.state.reconnect_attempts = 0
                 
                 logger.info("[%s] ✅ WebSocket connected to %s", 
                            self.state.call_id, target_url.split("/")[-1])
                 
-                # Flush pending audio buffer
+                # Flush pending audio buffer. asterisk_to_ai keeps parking frames
+                # here until ws_connected is set, so they go out in order. Binary
+                # messages are a raw PCM16 stream to the edge, so parked chunks
+                # are joined into a few large sends instead of one per chunk.
                 flushed = 0
-                while self.pending_buffer:
+                pending = self.pending_buffer
+                while pending:
+                    group = [pending.popleft()
+                             for _ in range(min(PENDING_FLUSH_GROUP, len(pending)))]
                     try:
-                        await self.ws.send(self.pending_buffer.popleft())
-                        flushed += 1
+                        await self.ws.send(b"".join(group))
+                        flushed += len(group)
                     except Exception:
                         self.pending_buffer.clear()
                         break
                 if flushed:
                     logger.info("[%s] 📤 Flushed %d pending frames", self.state.call_id, flushed)
                 
+                # A fresh edge session starts unpaused; playback re-sends
+                # flow_pause on its next tick if the backlog is still deep
+                self._flow_paused = False
+                self.state.ws_connected = True
+                self._ws_ready.set()
                 return True
                 
             except asyncio.TimeoutError:
@@ -813,20 +1552,37 @@ class TaxiBridge:
     # -------------------------------------------------------------------------
     
     async def heartbeat_loop(self) -> None:
-        """Periodic status logging with WS and Asterisk health."""
-        last_keepalive_log = time.time()
+        """Periodic status logging with WS and Asterisk health, plus the Asterisk read watchdog."""
+        last_keepalive_log = time.monotonic()
+        next_status = last_keepalive_log + HEARTBEAT_INTERVAL_S
         
         try:
             while self.running:
-                await asyncio.sleep(HEARTBEAT_INTERVAL_S)
+                # Wake for the next status log or the Asterisk read deadline,
+                # whichever is sooner, so a silent peer is caught at
+                # ASTERISK_READ_TIMEOUT_S rather than up to one interval late.
+                # While frames flow the deadline stays ahead: one wakeup per interval.
+                deadline = self.state.last_asterisk_recv + ASTERISK_READ_TIMEOUT_S
+                await asyncio.sleep(max(0.0, min(next_status, deadline) - time.monotonic()))
                 if not self.running:
                     break
                 
-                ws_age = time.time() - self.state.last_ws_activity
-                ast_age = time.time() - self.state.last_asterisk_recv
+                now = time.monotonic()
+                ast_age = now - self.state.last_asterisk_recv
+                
+                # Asterisk read watchdog (replaces a wait_for timer per frame)
+                if ast_age >= ASTERISK_READ_TIMEOUT_S:
+                    logger.warning("[%s] ⏱️ Asterisk read timeout", self.state.call_id)
+                    await self.stop_call("Asterisk timeout")
+                    break
+                
+                if now < next_status:
+                    continue  # Woke for a deadline that a new frame pushed back
+                next_status = now + HEARTBEAT_INTERVAL_S
+                ws_age = now - self.state.last_ws_activity
                 
-                ws_status = "🟢" if ws_age < 5 else "🟡" if ws_age < 15 else "🔴"
-                ast_status = "🟢" if ast_age < 5 else "🟡" if ast_age < 15 else "🔴"
+                ws_status = _STATUS_ICONS[(ws_age < 5) + (ws_age < 15)]
+                ast_status = _STATUS_ICONS[(ast_age < 5) + (ast_age < 15)]
                 
                 codec_icon = "🎵" if self.state.ast_codec == "opus" else "🔊"
                 
@@ -836,10 +1592,10 @@ class TaxiBridge:
                            self.state.frames_sent, self.state.frames_received)
                 
                 # Log keepalive activity periodically
-                if self.state.keepalive_count > 0 and time.time() - last_keepalive_log > 30:
+                if self.state.keepalive_count > 0 and now - last_keepalive_log > 30:
                     logger.debug("[%s] 💤 Silence frames sent: %d", 
                                 self.state.call_id, self.state.keepalive_count)
-                    last_keepalive_log = time.time()
+                    last_keepalive_log = now
                     
         except asyncio.CancelledError:
             pass
@@ -854,11 +1610,9 @@ class TaxiBridge:
                 
                 if self.ws and self.state.ws_connected:
                     try:
-                        await self.ws.send(json.dumps({
-                            "type": "ping",
-                            "call_id": self.state.call_id,
-                            "timestamp": int(time.time() * 1000),
-                        }))
+                        await self.ws.send(
+                            f"{self._ping_prefix}{int(time.time() * 1000)}}}"
+                        )
                         logger.debug("[%s] 🏓 App ping sent", self.state.call_id)
                     except Exception as e:
                         logger.warning("[%s] ⚠️ App ping failed: %s", self.state.call_id, e)
@@ -875,55 +1629,46 @@ class TaxiBridge:
         heartbeat_task = asyncio.create_task(self.heartbeat_loop())
         ping_task = asyncio.create_task(self.ws_ping_loop())
         
+        pipe_tasks: List[asyncio.Task] = []
+        
         try:
+            if not await self.connect_websocket():
+                await self.stop_call("WebSocket connection failed")
+                return
+            
+            # Send eager init on first connection
+            # IMPORTANT: Default to 8kHz slin - the edge function will resample
+            # The actual format will be sent via update_format once detected
+            if not self.state.init_sent and self.ws:
+                # Always start with 8kHz assumption - update_format will correct
+                # This ensures edge function resamples properly even before detection
+                payload = {
+                    "type": "init",
+                    "call_id": self.state.call_id,
+                    "phone": "unknown",
+                    "user_phone": "unknown",
+                    "addressTtsSplicing": True,
+                    "eager_init": True,
+                    "binary_audio_only": True,  # AI audio as raw PCM16 binary frames
+                    "inbound_format": "slin",  # Safe default - edge will resample 8k→24k
+                    "inbound_sample_rate": RATE_ULAW,  # 8000Hz - edge will 3x upsample
+                }
+                await self.ws.send(_json_dumps(payload))
+                self.state.init_sent = True
+                logger.info("[%s] 🚀 Eager init (slin @ %dHz, waiting for format detection)", 
+                           self.state.call_id, RATE_ULAW)
+            
+            # Bidirectional audio tasks run once for the whole call; a pipe that
+            # finishes (Asterisk hangup, stop_call) wakes this loop with None
+            pipe_tasks = [
+                asyncio.create_task(self.asterisk_to_ai()),
+                asyncio.create_task(self.ai_to_queue()),
+            ]
+            for task in pipe_tasks:
+                task.add_done_callback(lambda _t: self._ws_events.put_nowait(None))
+            
             while self.running:
-                # Connect/reconnect WebSocket
-                if not self.state.ws_connected:
-                    if not await self.connect_websocket():
-                        await self.stop_call("WebSocket connection failed")
-                        break
-                    
-                    # Send eager init on first connection
-                    # IMPORTANT: Default to 8kHz slin - the edge function will resample
-                    # The actual format will be sent via update_format once detected
-                    if not self.state.init_sent and self.ws:
-                        # Always start with 8kHz assumption - update_format will correct
-                        # This ensures edge function resamples properly even before detection
-                        payload = {
-                            "type": "init",
-                            "call_id": self.state.call_id,
-                            "phone": "unknown",
-                            "user_phone": "unknown",
-                            "addressTtsSplicing": True,
-                            "eager_init": True,
-                            "inbound_format": "slin",  # Safe default - edge will resample 8k→24k
-                            "inbound_sample_rate": RATE_ULAW,  # 8000Hz - edge will 3x upsample
-                        }
-                        await self.ws.send(json.dumps(payload))
-                        self.state.init_sent = True
-                        logger.info("[%s] 🚀 Eager init (slin @ %dHz, waiting for format detection)", 
-                                   self.state.call_id, RATE_ULAW)
-                
-                # Create bidirectional audio tasks
-                ast_task = asyncio.create_task(self.asterisk_to_ai())
-                ai_task = asyncio.create_task(self.ai_to_queue())
-                
-                done, pending = await asyncio.wait(
-                    {ast_task, ai_task},
-                    return_when=asyncio.FIRST_COMPLETED,
-                )
-                
-                # Cancel pending tasks
-                for t in pending:
-                    t.cancel()
-                await asyncio.gather(*pending, return_exceptions=True)
-                
-                # Handle completed task result
-                exc: Optional[BaseException] = None
-                for t in done:
-                    exc = t.exception()
-                    if exc:
-                        break
+                exc = await self._ws_events.get()
                 
                 if exc is None:
                     break  # Clean exit
@@ -956,7 +1701,10 @@ class TaxiBridge:
                     except Exception:
                         pass
                     self.ws = None
-                    continue  # Reconnect
+                    if not await self.connect_websocket():
+                        await self.stop_call("WebSocket connection failed")
+                        break
+                    continue
                 
                 logger.error("[%s] ❌ Unhandled error: %s", self.state.call_id, exc)
                 await self.stop_call("Unhandled error")
@@ -966,16 +1714,18 @@ class TaxiBridge:
             self.running = False
             
             # Cancel background tasks
-            for task in [playback_task, heartbeat_task, ping_task]:
+            tasks = [playback_task, heartbeat_task, ping_task, *pipe_tasks]
+            for task in tasks:
                 if not task.done():
                     task.cancel()
-            await asyncio.gather(playback_task, heartbeat_task, ping_task, return_exceptions=True)
+            await asyncio.gather(*tasks, return_exceptions=True)
             
             # Log final stats
-            logger.info("[%s] 📊 Final: %s@%dHz TX=%d RX=%d KA=%d HO=%d",
+            logger.info("[%s] 📊 Final: %s@%dHz TX=%d RX=%d DROP=%d KA=%d HO=%d",
                        self.state.call_id, self.state.ast_codec, self.state.ast_rate,
                        self.state.frames_sent, self.state.frames_received,
-                       self.state.keepalive_count, self.state.handoff_count)
+                       self.state.frames_dropped, self.state.keepalive_count,
+                       self.state.handoff_count)
             
             await self.cleanup()
     
@@ -983,6 +1733,7 @@ class TaxiBridge:
         """Release all resources."""
         self.audio_queue.clear()
         self.pending_buffer.clear()
+        self.audio_processor.close()
         
         try:
             if self.ws:
@@ -1002,89 +1753,116 @@ class TaxiBridge:
     # ASTERISK → AI
     # -------------------------------------------------------------------------
     
+    async def _read_frame(self) -> Tuple[int, bytes]:
+        """Read one AudioSocket frame as (msg_type, payload).
+        
+        readexactly() returns without suspending when the bytes are already
+        buffered, so a frame that arrived in one TCP segment costs one wakeup,
+        not two.
+        """
+        header = await self.reader.readexactly(3)
+        msg_len = (header[1] << 8) | header[2]  # big-endian u16
+        payload = await self.reader.readexactly(msg_len) if msg_len else b""
+        return header[0], payload
+    
     async def asterisk_to_ai(self) -> None:
         """Read audio from Asterisk and forward to AI."""
+        # Processed frames are coalesced into one binary message; the edge
+        # treats binary frames as a raw PCM16 stream, so no sub-framing needed
+        batch = bytearray()
+        batch_frames = 0
+        # Bind per-call objects once, as ai_to_queue does; the WebSocket and
+        # the inbound decoder are read per frame since they can be replaced.
+        state = self.state
+        call_id = state.call_id
+        read_frame = self._read_frame
+        process_inbound = self.audio_processor.process_inbound_frame
+        process_inbound_async = self.audio_processor.process_inbound_async
+        monotonic = time.monotonic
         try:
-            while self.running and self.state.ws_connected:
+            while self.running:
                 try:
-                    header = await asyncio.wait_for(
-                        self.reader.readexactly(3), 
-                        timeout=ASTERISK_READ_TIMEOUT_S
-                    )
-                    self.state.last_asterisk_recv = time.time()
-                    
-                    msg_type = header[0]
-                    msg_len = struct.unpack(">H", header[1:3])[0]
-                    payload = await self.reader.readexactly(msg_len)
+                    # No per-frame timer: heartbeat_loop is the read watchdog
+                    msg_type, payload = await read_frame()
+                    now = monotonic()  # One clock read per frame
+                    state.last_asterisk_recv = now
+                    msg_len = len(payload)
                     
                     if msg_type == MSG_UUID:
                         # Extract phone number from UUID
-                        raw_hex = payload.hex()
-                        if len(raw_hex) >= 12:
-                            self.state.phone = raw_hex[-12:]
-                        logger.info("[%s] 👤 Phone: %s", self.state.call_id, self.state.phone)
+                        # Last 6 bytes = 12 hex digits; only hex what we keep
+                        if msg_len >= 6:
+                            state.phone = payload[-6:].hex()
+                        logger.info("[%s] 👤 Phone: %s", call_id, state.phone)
                         
                         # Send phone update to edge function
-                        if self.ws and self.state.ws_connected:
-                            await self.ws.send(json.dumps({
+                        if self.ws and state.ws_connected:
+                            await self.ws.send(_json_dumps({
                                 "type": "update_phone",
-                                "call_id": self.state.call_id,
-                                "phone": self.state.phone,
-                                "user_phone": self.state.phone,
+                                "call_id": call_id,
+                                "phone": state.phone,
+                                "user_phone": state.phone,
                             }))
                     
                     elif msg_type == MSG_AUDIO:
-                        # Detect format (includes Opus detection)
-                        if msg_len != self.state.ast_frame_bytes or self.state.ast_codec != "opus":
+                        # Detect format (includes Opus detection) until it locks;
+                        # after that only PCM size flaps are noted (Opus sizes vary)
+                        if self._needs_detect:
                             await self._detect_format(msg_len, payload)
+                        elif msg_len != state.ast_frame_bytes and state.ast_codec != "opus":
+                            self._note_frame_size_change(msg_len)
                         
-                        # Decode based on codec
-                        if self.state.ast_codec == "opus":
-                            # Decode Opus to PCM at Opus native rate, then resample to AI rate
-                            if self.audio_processor.opus_codec:
-                                linear = self.audio_processor.opus_codec.decode_with_resample(
-                                    payload, RATE_AI
-                                )
-                            else:
-                                logger.warning("[%s] ⚠️ Opus frame but no decoder", self.state.call_id)
+                        # Decode + DSP pipeline (volume boost → AGC → pre-emphasis).
+                        # A 20ms PCM/µ-law frame takes less loop time inline than
+                        # an executor round trip; Opus decodes on the DSP worker,
+                        # which owns the codec.
+                        if state.ast_codec == "opus":
+                            if not self.audio_processor.opus_codec:
+                                logger.warning("[%s] ⚠️ Opus frame but no decoder", call_id)
                                 continue
-                        elif self.state.ast_codec == "ulaw":
-                            linear = self.audio_processor.ulaw_to_linear(payload)
+                            processed = await process_inbound_async(
+                                payload, self._inbound_decode, call_id
+                            )
                         else:
-                            linear = payload
+                            processed = process_inbound(payload, self._inbound_decode, call_id)
                         
-                        # Apply DSP pipeline (volume boost → AGC → pre-emphasis)
-                        processed = self.audio_processor.process_inbound(linear, self.state.call_id)
+                        batch += processed
+                        batch_frames += 1
+                        if batch_frames < WS_SEND_BATCH_FRAMES:
+                            continue
+                        chunk = bytes(batch)
+                        batch.clear()
                         
-                        # Send to AI (always as PCM16 - edge function expects this)
-                        if self.ws and self.state.ws_connected:
+                        # Send to AI (always as PCM16 - edge function expects this).
+                        # While the WebSocket is being replaced, park batches for
+                        # connect_websocket to flush.
+                        if self.ws and state.ws_connected:
                             try:
-                                await self.ws.send(processed)
-                                self.state.frames_sent += 1
-                                self.state.last_ws_activity = time.time()
-                            except Exception:
-                                self.pending_buffer.append(processed)
-                                raise
+                                await self.ws.send(chunk)
+                                state.frames_sent += batch_frames
+                                state.last_ws_activity = now
+                            except (ConnectionClosed, WebSocketException):
+                                self._park_inbound(chunk)
+                        else:
+                            self._park_inbound(chunk)
+                        batch_frames = 0
                     
                     elif msg_type == MSG_HANGUP:
-                        logger.info("[%s] 📴 Hangup from Asterisk", self.state.call_id)
+                        logger.info("[%s] 📴 Hangup from Asterisk", call_id)
                         await self.stop_call("Asterisk hangup")
                         return
                 
-                except asyncio.TimeoutError:
-                    logger.warning("[%s] ⏱️ Asterisk read timeout", self.state.call_id)
-                    await self.stop_call("Asterisk timeout")
-                    return
                 except asyncio.IncompleteReadError:
-                    logger.info("[%s] 📴 Asterisk connection closed", self.state.call_id)
+                    logger.info("[%s] 📴 Asterisk connection closed", call_id)
                     await self.stop_call("Asterisk closed")
                     return
                 except (ConnectionClosed, WebSocketException):
-                    raise
+                    # ai_to_queue sees the same close and run() reconnects
+                    continue
                 except asyncio.CancelledError:
                     return
                 except Exception as e:
-                    logger.error("[%s] ❌ Asterisk read error: %s", self.state.call_id, e)
+                    logger.error("[%s] ❌ Asterisk read error: %s", call_id, e)
                     await self.stop_call("Read error")
                     return
                     
@@ -1096,105 +1874,176 @@ class TaxiBridge:
     # -------------------------------------------------------------------------
     
     async def ai_to_queue(self) -> None:
-        """Receive audio and control messages from AI."""
-        try:
-            async for message in self.ws:
-                if not self.running:
-                    break
-                
-                self.state.last_ws_activity = time.time()
-                
-                # Binary audio from AI
-                if isinstance(message, bytes):
-                    out = self.audio_processor.process_outbound(
-                        message, RATE_AI, self.state.ast_rate, self.state.ast_codec
-                    )
-                    self.audio_queue.append(out)
-                    self.state.frames_received += 1
-                    continue
-                
-                # JSON control messages
-                data = json.loads(message)
-                msg_type = data.get("type")
-                
-                if msg_type in ("audio", "address_tts"):
-                    raw_audio = base64.b64decode(data["audio"])
-                    out = self.audio_processor.process_outbound(
-                        raw_audio, RATE_AI, self.state.ast_rate, self.state.ast_codec
-                    )
-                    self.audio_queue.append(out)
-                    self.state.frames_received += 1
-                
-                elif msg_type == "transcript":
-                    role = data.get("role", "?").upper()
-                    text = data.get("text", "")
-                    logger.info("[%s] 💬 %s: %s", self.state.call_id, role, text)
-                
-                elif msg_type in ("speech_started", "speech_stopped"):
-                    duration = data.get("duration", "")
-                    suffix = f" ({duration}s)" if duration else ""
-                    emoji = "🎤" if msg_type == "speech_started" else "🔇"
-                    logger.debug("[%s] %s Speech %s%s", self.state.call_id, emoji,
-                                "started" if msg_type == "speech_started" else "stopped", suffix)
-                
-                elif msg_type == "ai_interrupted":
-                    flushed = len(self.audio_queue)
-                    self.audio_queue.clear()
-                    logger.info("[%s] 🛑 Barge-in: flushed %d chunks", self.state.call_id, flushed)
-                
-                elif msg_type == "redirect":
-                    raise RedirectException(data.get("url", WS_URL), data.get("init_data", {}))
-                
-                elif msg_type == "session.handoff":
-                    # Edge function approaching 90s limit
-                    self.state.handoff_count += 1
-                    logger.info("[%s] 🔄 Session handoff #%d", 
-                               self.state.call_id, self.state.handoff_count)
-                    # Send actual codec name for correct edge function handling
-                    inbound_fmt = self.state.ast_codec
-                    raise RedirectException(
-                        url=self.state.current_ws_url,
-                        init_data={
-                            "resume": True,
-                            "resume_call_id": data.get("call_id", self.state.call_id),
-                            "phone": self.state.phone,
-                            "inbound_format": inbound_fmt,
-                            "inbound_sample_rate": self.state.ast_rate,
-                        }
-                    )
-                
-                elif msg_type == "call_ended":
-                    logger.info("[%s] 📴 AI ended call: %s", 
-                               self.state.call_id, data.get("reason", "unknown"))
-                    self.state.call_formally_ended = True
-                    raise CallEndedException()
-                
-                elif msg_type == "hangup":
-                    logger.info("[%s] 📴 Hangup from edge function: %s", 
-                               self.state.call_id, data.get("reason", "end_call"))
-                    self.state.call_formally_ended = True
-                    raise CallEndedException()
-                
-                elif msg_type == "keepalive":
-                    if self.ws and self.state.ws_connected:
-                        await self.ws.send(json.dumps({
-                            "type": "keepalive_ack",
-                            "timestamp": data.get("timestamp"),
-                            "call_id": self.state.call_id,
-                        }))
-                
-                elif msg_type == "error":
-                    logger.error("[%s] 🧨 AI error: %s", 
-                                self.state.call_id, data.get("error", "unknown"))
-        
-        except (RedirectException, CallEndedException):
-            raise
-        except (ConnectionClosed, WebSocketException):
-            raise
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            logger.error("[%s] ❌ AI message error: %s", self.state.call_id, e)
+        """Receive audio and control messages from AI.
+        
+        Runs for the whole call. When a socket ends (redirect/handoff, close,
+        call end) the outcome is handed to run(), which swaps in the new socket
+        and sets _ws_ready again.
+        """
+        # Bind per-call objects once; the codec/rate are read per message
+        # because format detection can still change them mid-stream.
+        state = self.state
+        handlers = self._handlers
+        process_outbound = self.audio_processor.process_outbound_async
+        enqueue = self._enqueue_audio
+        monotonic = time.monotonic
+        
+        while self.running:
+            await self._ws_ready.wait()
+            outcome: Optional[BaseException] = None
+            try:
+                async for message in self.ws:
+                    if not self.running:
+                        break
+                    
+                    state.last_ws_activity = monotonic()
+                    
+                    # Binary audio from AI
+                    if isinstance(message, bytes):
+                        enqueue(await process_outbound(
+                            message, RATE_AI, state.ast_rate, state.ast_codec
+                        ))
+                        state.frames_received += 1
+                        continue
+                    
+                    # JSON audio in the edge's exact shape: slice out the base64
+                    # (which can never contain a quote) instead of parsing
+                    if message.startswith(_AUDIO_MSG_PREFIX) and message.endswith(_AUDIO_MSG_SUFFIX):
+                        b64 = message[len(_AUDIO_MSG_PREFIX):-len(_AUDIO_MSG_SUFFIX)]
+                        if '"' not in b64:
+                            self._note_json_audio()
+                            await self._queue_ai_audio(_b64decode(b64))
+                            continue
+                    
+                    # JSON control messages (unknown types are ignored)
+                    data = _json_loads(message)
+                    handler = handlers.get(data.get("type"))
+                    if handler is not None:
+                        await handler(data)
+            
+            except (RedirectException, CallEndedException,
+                    ConnectionClosed, WebSocketException) as e:
+                outcome = e
+            except asyncio.CancelledError:
+                return
+            except Exception as e:
+                logger.error("[%s] ❌ AI message error: %s", self.state.call_id, e)
+            
+            if not self.running:
+                return
+            self._ws_ready.clear()
+            self._ws_events.put_nowait(outcome)
+    
+    # -------------------------------------------------------------------------
+    # BOUNDED AUDIO QUEUES
+    # -------------------------------------------------------------------------
+    # Both deques have a maxlen, so a full queue evicts its oldest chunk
+    # instead of blocking the producer: a short gap beats a growing stall.
+    
+    def _enqueue_audio(self, chunk: bytes) -> None:
+        """Queue AI audio for playback to Asterisk."""
+        if len(self.audio_queue) == AUDIO_QUEUE_MAXLEN:
+            self.state.frames_dropped += 1
+        self.audio_queue.append(chunk)
+    
+    def _park_inbound(self, chunk: bytes) -> None:
+        """Hold caller audio until the WebSocket is back."""
+        if len(self.pending_buffer) == PENDING_BUFFER_MAXLEN:
+            self.state.frames_dropped += 1
+        self.pending_buffer.append(chunk)
+    
+    # -------------------------------------------------------------------------
+    # AI MESSAGE HANDLERS (dispatched by JSON "type")
+    # -------------------------------------------------------------------------
+    
+    async def _on_json_audio(self, data: dict) -> None:
+        self._note_json_audio()
+        await self._on_audio(data)
+    
+    async def _on_audio(self, data: dict) -> None:
+        await self._queue_ai_audio(_b64decode(data["audio"]))
+    
+    def _note_json_audio(self) -> None:
+        """Log once that the edge streams "audio" as base64 JSON."""
+        # Still played, but an edge that keeps sending it ignored
+        # binary_audio_only (address_tts is always JSON, so it is not counted)
+        if not self._json_audio_seen:
+            self._json_audio_seen = True
+            logger.info("[%s] ℹ️ Edge sends base64 JSON audio (binary preferred)",
+                       self.state.call_id)
+    
+    async def _queue_ai_audio(self, raw_audio: bytes) -> None:
+        """Convert decoded AI PCM for the Asterisk format and queue it."""
+        self._enqueue_audio(await self.audio_processor.process_outbound_async(
+            raw_audio, RATE_AI, self.state.ast_rate, self.state.ast_codec
+        ))
+        self.state.frames_received += 1
+    
+    async def _on_transcript(self, data: dict) -> None:
+        role = data.get("role", "?").upper()
+        text = data.get("text", "")
+        logger.info("[%s] 💬 %s: %s", self.state.call_id, role, text)
+    
+    async def _on_speech(self, data: dict) -> None:
+        if not logger.isEnabledFor(logging.DEBUG):
+            return  # Debug-only; skip building the suffix
+        msg_type = data.get("type")
+        duration = data.get("duration", "")
+        suffix = f" ({duration}s)" if duration else ""
+        emoji = "🎤" if msg_type == "speech_started" else "🔇"
+        logger.debug("[%s] %s Speech %s%s", self.state.call_id, emoji,
+                    "started" if msg_type == "speech_started" else "stopped", suffix)
+    
+    async def _on_ai_interrupted(self, data: dict) -> None:
+        flushed = len(self.audio_queue)
+        self.audio_queue.clear()
+        self._playback_flush = True
+        # The next response starts fresh; don't filter it against the old tail
+        self.audio_processor.reset_outbound()
+        logger.info("[%s] 🛑 Barge-in: flushed %d chunks", self.state.call_id, flushed)
+    
+    async def _on_redirect(self, data: dict) -> None:
+        raise RedirectException(data.get("url", WS_URL), data.get("init_data", {}))
+    
+    async def _on_handoff(self, data: dict) -> None:
+        # Edge function approaching 90s limit
+        self.state.handoff_count += 1
+        logger.info("[%s] 🔄 Session handoff #%d", 
+                   self.state.call_id, self.state.handoff_count)
+        # Send actual codec name for correct edge function handling
+        inbound_fmt = self.state.ast_codec
+        raise RedirectException(
+            url=self.state.current_ws_url,
+            init_data={
+                "resume": True,
+                "resume_call_id": data.get("call_id", self.state.call_id),
+                "phone": self.state.phone,
+                "inbound_format": inbound_fmt,
+                "inbound_sample_rate": self.state.ast_rate,
+            }
+        )
+    
+    async def _on_call_ended(self, data: dict) -> None:
+        logger.info("[%s] 📴 AI ended call: %s", 
+                   self.state.call_id, data.get("reason", "unknown"))
+        self.state.call_formally_ended = True
+        raise CallEndedException()
+    
+    async def _on_hangup(self, data: dict) -> None:
+        logger.info("[%s] 📴 Hangup from edge function: %s", 
+                   self.state.call_id, data.get("reason", "end_call"))
+        self.state.call_formally_ended = True
+        raise CallEndedException()
+    
+    async def _on_keepalive(self, data: dict) -> None:
+        if self.ws and self.state.ws_connected:
+            await self.ws.send(
+                self._keepalive_ack_prefix + _json_dumps(data.get("timestamp")) + "}"
+            )
+    
+    async def _on_error(self, data: dict) -> None:
+        logger.error("[%s] 🧨 AI error: %s", 
+                    self.state.call_id, data.get("error", "unknown"))
     
     # -------------------------------------------------------------------------
     # QUEUE → ASTERISK
@@ -1202,76 +2051,135 @@ class TaxiBridge:
     
     async def queue_to_asterisk(self) -> None:
         """Stream audio from queue to Asterisk with proper pacing."""
-        start_time = time.time()
-        bytes_played = 0
+        # Pace off the loop's monotonic clock: immune to NTP/wall-clock jumps.
+        # Every frame advances the deadline by one fixed tick (its duration).
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
         buffer = bytearray()
+        buf_off = 0  # Read offset into buffer; consumed bytes are compacted lazily
+        format_gen = -1  # Forces the per-format locals to bind on the first tick
+        opus_tail_due = False  # AI audio arrived since the encoder carry was last flushed
         
-        # Opus uses variable-size frames, so we track by time instead of bytes
-        # For PCM codecs, we use fixed frame sizes
+        # Opus packets vary in size but each holds OPUS_FRAME_MS of audio;
+        # PCM frames are a fixed ast_frame_bytes
         
         try:
             while self.running:
+                if self._playback_flush:
+                    self._playback_flush = False
+                    buffer.clear()
+                    buf_off = 0
+                    opus_tail_due = False  # reset_outbound drops the carry
+                
+                # Compact consumed bytes in bulk rather than on every frame
+                if buf_off and (buf_off > 8192 or buf_off > len(buffer) // 2):
+                    del buffer[:buf_off]
+                    buf_off = 0
+                
                 # Drain queue to buffer
-                while self.audio_queue:
-                    buffer.extend(self.audio_queue.popleft())
+                if self.audio_queue:
+                    opus_tail_due = True
+                    while self.audio_queue:
+                        buffer.extend(self.audio_queue.popleft())
                 
-                # Calculate pacing based on codec
-                if self.state.ast_codec == "opus":
-                    # Opus: send entire encoded frames as they arrive
-                    # Frame timing is handled by encoder (20ms frames)
-                    bytes_per_sec = OPUS_BITRATE // 8  # Approximate
-                else:
-                    # PCM pacing: derive from negotiated sample rate.
-                    # AudioSocket may deliver 10ms frames (e.g. 320 bytes at 16kHz),
-                    # so assuming 20ms (50 frames/sec) can make playback 2× slower.
-                    if self.state.ast_codec == "ulaw":
+                # Per-format constants: rebound only when the format lock changes,
+                # so a steady call runs the loop on plain locals
+                if format_gen != self._format_gen:
+                    format_gen = self._format_gen
+                    is_opus = self.state.ast_codec == "opus"
+                    frame_bytes = self.state.ast_frame_bytes
+                    pcm_header = self._audio_header
+                    silence = self._opus_silence_frame() if is_opus else self._silence_frame()
+                    
+                    # Calculate pacing based on codec
+                    if is_opus:
+                        # Opus: send entire encoded frames as they arrive
+                        # Frame timing is handled by encoder (20ms frames)
+                        bytes_per_sec = OPUS_BITRATE // 8  # Approximate
+                    elif self.state.ast_codec == "ulaw":
+                        # PCM pacing: derive from negotiated sample rate.
+                        # AudioSocket may deliver 10ms frames (e.g. 320 bytes at 16kHz),
+                        # so assuming 20ms (50 frames/sec) can make playback 2× slower.
                         # 8k samples/sec × 1 byte/sample
                         bytes_per_sec = max(1, self.state.ast_rate)
                     else:
                         # PCM16 mono: sample_rate × 2 bytes/sample
                         bytes_per_sec = max(1, self.state.ast_rate * 2)
+                    tick = OPUS_FRAME_MS / 1000 if is_opus else frame_bytes / bytes_per_sec
+                
+                # Backpressure: the local buffer is the real playback backlog
+                # (audio_queue is drained into it every tick)
+                backlog_s = (len(buffer) - buf_off) / bytes_per_sec
+                if self._flow_paused:
+                    if backlog_s <= PLAYBACK_LOW_WATERMARK_S:
+                        await self._send_flow_control(False, backlog_s)
+                elif backlog_s >= PLAYBACK_HIGH_WATERMARK_S:
+                    await self._send_flow_control(True, backlog_s)
                 
                 # Pace to real-time
-                expected_time = start_time + (bytes_played / max(1, bytes_per_sec))
-                delay = expected_time - time.time()
-                if delay > 0:
+                delay = next_tick - loop.time()
+                if delay > 0.0005:
                     await asyncio.sleep(delay)
                 
                 if not self.running:
                     break
                 
                 # Get next frame
-                if self.state.ast_codec == "opus":
-                    # For Opus, send complete encoded frames
-                    # The AudioProcessor already encodes to Opus frames
-                    if len(buffer) > 0:
-                        # Send the entire buffer as it contains Opus frames
-                        chunk = bytes(buffer)
-                        buffer.clear()
+                if is_opus:
+                    # One AudioSocket-framed Opus packet (20ms) per tick; the
+                    # AudioProcessor already encodes and frames each packet
+                    if len(buffer) - buf_off >= 3:
+                        end = buf_off + 3 + ((buffer[buf_off + 1] << 8) | buffer[buf_off + 2])
+                        chunk = bytes(memoryview(buffer)[buf_off:end])
+                        buf_off = end
                     else:
-                        # Generate silence frame (encode silence to Opus)
-                        if self.audio_processor.opus_codec:
-                            silence_pcm = bytes(self.audio_processor.opus_codec.frame_size * 2)
-                            chunk = self.audio_processor.opus_codec.encode(silence_pcm)
-                        else:
-                            chunk = b"\x00" * 80  # Approximate Opus silence frame
+                        chunk = silence  # Already AudioSocket-framed
                         self.state.keepalive_count += 1
+                        if opus_tail_due:
+                            # Playback ran dry: the encoder's sub-frame carry is
+                            # the end of this stretch of speech, so pad it out now.
+                            # Chunks queued meanwhile were encoded before the
+                            # flush, so drain them first to keep packet order.
+                            opus_tail_due = False
+                            tail = await self.audio_processor.flush_outbound_async()
+                            if tail and not self._playback_flush:
+                                while self.audio_queue:
+                                    buffer.extend(self.audio_queue.popleft())
+                                buffer += tail
                 else:
                     # PCM codecs: fixed frame sizes
-                    if len(buffer) >= self.state.ast_frame_bytes:
-                        chunk = bytes(buffer[:self.state.ast_frame_bytes])
-                        del buffer[:self.state.ast_frame_bytes]
+                    if len(buffer) - buf_off >= frame_bytes:
+                        # One copy out of the buffer, deliberately: on Python 3.12+
+                        # the transport may hold on to a memoryview we hand it until
+                        # the socket drains, and an exported view would make the
+                        # bytearray un-resizable (BufferError on extend/compaction)
+                        chunk = bytes(memoryview(buffer)[buf_off:buf_off + frame_bytes])
+                        buf_off += frame_bytes
                     else:
-                        chunk = self._silence_frame()
+                        chunk = silence
                         self.state.keepalive_count += 1
                 
                 # Send to Asterisk
                 try:
-                    frame = struct.pack(">BH", MSG_AUDIO, len(chunk)) + chunk
-                    self.writer.write(frame)
+                    frames = 1
+                    if is_opus:
+                        self.writer.write(chunk)  # Already AudioSocket-framed
+                    else:
+                        # PCM chunks are always exactly ast_frame_bytes long.
+                        # If the loop has fallen behind, coalesce the frames
+                        # that are already due into one write + drain.
+                        parts = [pcm_header, chunk]
+                        now = loop.time()
+                        while (frames < ASTERISK_WRITE_BATCH
+                               and len(buffer) - buf_off >= frame_bytes
+                               and next_tick + frames * tick <= now):
+                            parts.append(pcm_header)
+                            parts.append(bytes(memoryview(buffer)[buf_off:buf_off + frame_bytes]))
+                            buf_off += frame_bytes
+                            frames += 1
+                        self.writer.writelines(parts)
                     await self.writer.drain()
-                    bytes_played += len(chunk)
-                    self.state.last_asterisk_send = time.time()
+                    next_tick += frames * tick
                 except (BrokenPipeError, ConnectionResetError, OSError) as e:
                     logger.warning("[%s] 🔌 Asterisk pipe closed: %s", self.state.call_id, e)
                     await self.stop_call("Asterisk disconnected")
@@ -1284,10 +2192,39 @@ class TaxiBridge:
         except asyncio.CancelledError:
             pass
     
+    async def _send_flow_control(self, paused: bool, backlog_s: float) -> None:
+        """Tell the edge function to hold/release AI audio as playback backlog crosses a watermark."""
+        self._flow_paused = paused
+        msg_type = "flow_pause" if paused else "flow_resume"
+        logger.info("[%s] 🚦 %s (%.1fs queued)", self.state.call_id, msg_type, backlog_s)
+        if self.ws and self.state.ws_connected:
+            try:
+                await self.ws.send(_json_dumps({
+                    "type": msg_type,
+                    "call_id": self.state.call_id,
+                    "buffered_ms": int(backlog_s * 1000),
+                }))
+            except Exception as e:
+                logger.debug("[%s] %s not sent: %s", self.state.call_id, msg_type, e)
+    
+    def _opus_silence_frame(self) -> bytes:
+        """AudioSocket-framed Opus silence packet (built once per format lock)."""
+        if self.audio_processor.opus_codec:
+            packet = self.audio_processor.opus_codec.silence_packet  # Pre-encoded
+        else:
+            packet = b"\x00" * 80  # Approximate Opus silence frame
+        return _AUDIOSOCKET_HEADER.pack(MSG_AUDIO, len(packet)) + packet
+    
     def _silence_frame(self) -> bytes:
-        """Generate one frame of silence for non-Opus codecs."""
-        silence_byte = 0xFF if self.state.ast_codec == "ulaw" else 0x00
-        return bytes([silence_byte]) * self.state.ast_frame_bytes
+        """Return one frame of silence for non-Opus codecs (cached per format)."""
+        codec, frame_bytes, frame = self._silence_cache
+        if codec == self.state.ast_codec and frame_bytes == self.state.ast_frame_bytes:
+            return frame
+        
+        fill = ULAW_SILENCE_BYTE if self.state.ast_codec == "ulaw" else PCM_SILENCE_BYTE
+        frame = fill * self.state.ast_frame_bytes
+        self._silence_cache = (self.state.ast_codec, self.state.ast_frame_bytes, frame)
+        return frame
 
 
 # =============================================================================
@@ -1311,6 +2248,7 @@ async def main() -> None:
         f"   Listening: {AUDIOSOCKET_HOST}:{AUDIOSOCKET_PORT}",
         f"   Endpoint:  {WS_URL.split('/')[-1]}",
         f"   Opus:      {opus_status}",
+        f"   Loop:      {'uvloop' if UVLOOP_AVAILABLE else 'asyncio (pip install uvloop for lower overhead)'}",
         f"   Format:    {'slin16 locked (16kHz)' if LOCK_FORMAT_SLIN16 else 'ulaw locked' if LOCK_FORMAT_ULAW else 'auto-detect (ulaw/slin/slin16/opus)'}",
         f"   DSP:       boost={VOLUME_BOOST_FACTOR}x AGC={AGC_MAX_GAIN}x pre-emph={PRE_EMPHASIS_COEFF}",
         f"   Reconnect: {MAX_RECONNECT_ATTEMPTS} attempts, {RECONNECT_BASE_DELAY_S}s base delay",
@@ -1329,6 +2267,12 @@ async def main() -> None:
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        if UVLOOP_AVAILABLE and hasattr(uvloop, "run"):
+            uvloop.run(main())
+        else:
+            if UVLOOP_AVAILABLE:
+                # uvloop < 0.18 has no run(); install it via the loop policy
+                asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("👋 Shutdown requested")
@@ -2702,6 +2702,10 @@ DO NOT say "booked" or "confirmed" until book_taxi with action: "confirmed" retu
   let greetingFallbackTimer: ReturnType<typeof setTimeout> | null = null;
   // Monitoring: throttle DB inserts for audio playback in the LiveCalls panel
   let monitorAiChunkCount = 0;
+  // Playback backpressure: the Python bridge sends flow_pause when its playback
+  // backlog runs deep; hold AI audio here until flow_resume instead of piling it up there
+  let bridgeFlowPaused = false;
+  const heldAiAudio: ArrayBuffer[] = [];
   
   const sendGreeting = () => {
     if (greetingSent || !openaiWs || openaiWs.readyState !== WebSocket.OPEN) {
@@ -2913,7 +2917,11 @@ DO NOT say "booked" or "confirmed" until book_taxi with action: "confirmed" retu
                 for (let i = 0; i < binaryString.length; i++) {
                   bytes[i] = binaryString.charCodeAt(i);
                 }
-                socket.send(bytes.buffer);
+                if (bridgeFlowPaused) {
+                  heldAiAudio.push(bytes.buffer);
+                } else {
+                  socket.send(bytes.buffer);
+                }
               } catch (e) {
                 console.error(`[${callId}] ❌ Failed to decode audio delta:`, e);
               }
@@ -5559,6 +5567,7 @@ Do NOT skip any part. Say ALL of it warmly.]`
             } catch (_) {
               // ignore
             }
+            heldAiAudio.length = 0; // Cancelled response - never play what was held back
             try {
               socket.send(JSON.stringify({ type: "ai_interrupted" }));
             } catch (_) {
@@ -5644,6 +5653,7 @@ Do NOT skip any part. Say ALL of it warmly.]`
             } catch (_) {
               // ignore
             }
+            heldAiAudio.length = 0; // Cancelled response - never play what was held back
             try {
               socket.send(JSON.stringify({ type: "ai_interrupted" }));
             } catch (_) {
@@ -5860,6 +5870,17 @@ ${sessionState.awaitingConfirmation
               console.error(`[${callId}] ❌ Error restoring session:`, e);
             }
           }
+        } else if (data.type === "flow_pause") {
+          // Bridge playback backlog crossed its high watermark - hold AI audio
+          bridgeFlowPaused = true;
+          console.log(`[${callId}] 🚦 Bridge flow_pause (${data.buffered_ms}ms queued) - holding AI audio`);
+        } else if (data.type === "flow_resume") {
+          // Backlog drained to the low watermark - release held audio in order
+          bridgeFlowPaused = false;
+          console.log(`[${callId}] 🚦 Bridge flow_resume - releasing ${heldAiAudio.length} held chunks`);
+          for (const buf of heldAiAudio.splice(0)) {
+            if (socket.readyState === WebSocket.OPEN) socket.send(buf);
+          }
         } else if (data.type === "keepalive_ack") {
           // Bridge acknowledged our keepalive - connection is alive
           // (no action needed, just confirms the connection is healthy)